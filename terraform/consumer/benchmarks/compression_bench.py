@@ -0,0 +1,74 @@
+"""
+Producer 압축 코덱별 배치 압축률과 배치당 CPU 비용 비교
+
+kafka-python의 MemoryRecordsBuilder로 실제 Producer와 같은 record batch(v2)를 만들어 측정합니다.
+설치되지 않은 코덱은 건너뜁니다.
+
+실행: consumer 디렉터리에서 PYTHONPATH=../modules/lambda/lambda-function python -m benchmarks.compression_bench
+(notification_codec의 원본은 Lambda 소스에 있습니다)
+"""
+import time
+
+from kafka.codec import has_gzip, has_lz4, has_snappy, has_zstd
+from kafka.record.default_records import DefaultRecordBatchBuilder
+from kafka.record.memory_records import MemoryRecordsBuilder, MemoryRecords
+
+from benchmarks.messages import sample_notification
+from notification_codec import encode_compact, encode_notification
+
+CODECS = [
+    ('none', lambda: True, DefaultRecordBatchBuilder.CODEC_NONE),
+    ('gzip', has_gzip, DefaultRecordBatchBuilder.CODEC_GZIP),
+    ('snappy', has_snappy, DefaultRecordBatchBuilder.CODEC_SNAPPY),
+    ('lz4', has_lz4, DefaultRecordBatchBuilder.CODEC_LZ4),
+    ('zstd', has_zstd, DefaultRecordBatchBuilder.CODEC_ZSTD),
+]
+BATCH_SIZES = [1, 10, 100]
+ROUNDS = 200
+
+
+def build_batch(values, compression_type):
+    builder = MemoryRecordsBuilder(magic=2, compression_type=compression_type, batch_size=1024 * 1024)
+    timestamp_ms = int(time.time() * 1000)
+    for value in values:
+        builder.append(timestamp_ms, None, value, [])
+    builder.close()
+    return builder.buffer()
+
+
+def read_batch(buffer):
+    records = MemoryRecords(buffer)
+    count = 0
+    while records.has_next():
+        for _ in records.next_batch():
+            count += 1
+    return count
+
+
+def run():
+    for format_name, encode in (('json', encode_notification), ('compact', encode_compact)):
+        print(f"== message format: {format_name}")
+        print(f"{'codec':<8} {'batch':>5} {'bytes':>8} {'ratio':>6} {'compress us/batch':>18} {'decompress us/batch':>20}")
+        for batch_size in BATCH_SIZES:
+            values = [encode(sample_notification(i, ('positive', 'negative', 'feedback')[i % 3])) for i in range(batch_size)]
+            uncompressed = len(build_batch(values, DefaultRecordBatchBuilder.CODEC_NONE))
+            for name, available, compression_type in CODECS:
+                if not available():
+                    print(f"{name:<8} {batch_size:>5} (not installed)")
+                    continue
+                start = time.process_time()
+                for _ in range(ROUNDS):
+                    buffer = build_batch(values, compression_type)
+                compress_us = (time.process_time() - start) / ROUNDS * 1e6
+
+                start = time.process_time()
+                for _ in range(ROUNDS):
+                    assert read_batch(buffer) == batch_size
+                decompress_us = (time.process_time() - start) / ROUNDS * 1e6
+
+                print(f"{name:<8} {batch_size:>5} {len(buffer):>8} {uncompressed / len(buffer):>6.2f} "
+                      f"{compress_us:>18.1f} {decompress_us:>20.1f}")
+
+
+if __name__ == '__main__':
+    run()
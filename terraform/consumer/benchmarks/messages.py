@@ -0,0 +1,13 @@
+"""벤치마크에서 공통으로 사용하는 메시지 샘플 (producer.build_message가 만드는 형태와 동일)."""
+
+
+def sample_notification(i: int = 0, category: str = 'positive') -> dict:
+    return {
+        'fileName': f'review_report_{i:05d}.pdf',
+        'bucketName': 'fanda-bucket-aws9-3',
+        'fileSize': 123456 + i,
+        'uploadTime': '2025-08-21T09:15:30.123Z',
+        'version': '25.08.21',
+        's3Url': f's3://fanda-bucket-aws9-3/reports/{category}/review_report_{i:05d}.pdf',
+        'category': category,
+    }
@@ -0,0 +1,135 @@
+"""
+알림 렌더링 비용 비교 (메시지마다 MIME/Block Kit을 새로 만드는 기존 방식 vs 미리 만든 템플릿)
+
+실행: consumer 디렉터리에서 python -m benchmarks.render_bench
+"""
+import email
+import json
+import os
+import timeit
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+from benchmarks.messages import sample_notification
+
+NUMBER = 20000
+
+
+def legacy_email(message: dict, sender: str, recipient: str) -> str:
+    """템플릿 도입 전 EmailHandler._create_email_message(...).as_string()과 동일한 처리."""
+    file_name = message.get('fileName', 'Unknown file')
+    bucket_name = message.get('bucketName', 'Unknown bucket')
+    file_size = message.get('fileSize', 'Unknown size')
+    upload_time = message.get('uploadTime', 'Unknown time')
+    view_url = message.get('httpUrl', message.get('s3Url', ''))
+
+    msg = MIMEMultipart('alternative')
+    msg['Subject'] = f"New File Uploaded: {file_name}"
+    msg['From'] = sender
+    msg['To'] = recipient
+
+    html_body = f"""
+        <html>
+          <body>
+            <h2>New File Uploaded to S3</h2>
+            <p>File Name: {file_name}<br/>
+               Bucket: {bucket_name}<br/>
+               File Size: {file_size}<br/>
+               Upload Time: {upload_time}</p>
+            {f'<a href="{view_url}">View File in S3</a>' if view_url else ''}
+          </body>
+        </html>
+        """
+    text_body = f"New File Uploaded to S3\nFile Name: {file_name}\nBucket: {bucket_name}\nFile Size: {file_size}\nUpload Time: {upload_time}\n{f'View File: {view_url}' if view_url else ''}"
+
+    msg.attach(MIMEText(text_body, 'plain'))
+    msg.attach(MIMEText(html_body, 'html'))
+    return msg.as_string()
+
+
+def legacy_slack(message: dict, category: str) -> list:
+    """템플릿 도입 전 SlackHandler._format_message와 동일한 처리."""
+    file_name = message.get('fileName', 'Unknown file')
+    file_size = message.get('fileSize', 'Unknown size')
+    upload_time = message.get('uploadTime', 'Unknown time')
+    view_url = message.get('httpUrl', message.get('s3Url', ''))
+    version = message.get("version", "Unknown version")
+
+    header_text = f"💡 신규 파일 업로드 알림_{version}"
+    if category == "positive":
+        header_text = f"💡 긍정 리뷰 분석 보고서_{version}"
+    elif category == "negative":
+        header_text = f"💡 부정 리뷰 분석 보고서_{version}"
+    elif category == "feedback":
+        header_text = f"💡 피드백 개선 보고서_{version}"
+
+    blocks = [
+        {"type": "header", "text": {"type": "plain_text", "text": header_text}},
+        {"type": "divider"},
+        {"type": "section", "text": {"type": "mrkdwn", "text": f"*파일명:*\n<{view_url}|{file_name}>"}},
+        {"type": "section", "fields": [
+            {"type": "mrkdwn", "text": f"*파일 크기:*\n{file_size} bytes"},
+            {"type": "mrkdwn", "text": f"*업로드 시간:*\n{upload_time}"}
+        ]}
+    ]
+    if view_url:
+        blocks.append({
+            "type": "actions",
+            "elements": [{"type": "button", "text": {"type": "plain_text", "text": "View in S3"}, "url": view_url, "style": "primary"}]
+        })
+    return blocks
+
+
+def _report(name: str, legacy_seconds: float, template_seconds: float) -> None:
+    print(f"{name:<6} {legacy_seconds / NUMBER * 1e6:>12.2f} {template_seconds / NUMBER * 1e6:>14.2f} {legacy_seconds / template_seconds:>8.1f}x")
+
+
+def bench_email(message: dict) -> None:
+    os.environ.setdefault('EMAIL_SENDER', 'sender@example.com')
+    os.environ.setdefault('EMAIL_PASSWORD', 'unused')
+    os.environ.setdefault('EMAIL_RECIPIENT', 'team@example.com')
+    from channels.email_handler import EmailHandler
+
+    handler = EmailHandler()
+    try:
+        # 두 방식이 같은 내용을 만드는지 확인합니다.
+        rendered = email.message_from_string(handler._create_email_message(message))
+        expected = email.message_from_string(legacy_email(message, handler.sender_email, handler.recipient_email))
+        assert rendered['Subject'] == expected['Subject']
+        assert [part.get_payload(decode=True) for part in rendered.walk()] == [part.get_payload(decode=True) for part in expected.walk()]
+
+        legacy_seconds = timeit.timeit(lambda: legacy_email(message, handler.sender_email, handler.recipient_email), number=NUMBER)
+        template_seconds = timeit.timeit(lambda: handler._create_email_message(message), number=NUMBER)
+        _report('email', legacy_seconds, template_seconds)
+    finally:
+        handler.close()
+
+
+def bench_slack(message: dict) -> None:
+    try:
+        from channels.slack_handler import SlackHandler
+    except ImportError:
+        print("slack  (slack_sdk not installed)")
+        return
+
+    category = message['category']
+    # _format_message는 인스턴스 상태를 사용하지 않으므로 클라이언트 없이 호출합니다.
+    assert SlackHandler._format_message(None, message, category) == legacy_slack(message, category)
+    legacy_seconds = timeit.timeit(lambda: legacy_slack(message, category), number=NUMBER)
+    template_seconds = timeit.timeit(lambda: SlackHandler._format_message(None, message, category), number=NUMBER)
+    _report('slack', legacy_seconds, template_seconds)
+    # 참고: slack_sdk가 요청 본문을 만들 때 blocks를 JSON으로 직렬화하는 비용 (block을 만드는 비용보다 큽니다)
+    blocks = SlackHandler._format_message(None, message, category)
+    encode_seconds = timeit.timeit(lambda: json.dumps(blocks), number=NUMBER)
+    print(f"{'':<6} blocks json.dumps {encode_seconds / NUMBER * 1e6:.2f} us/msg")
+
+
+def run():
+    message = sample_notification()
+    print(f"{'target':<6} {'legacy us/msg':>12} {'template us/msg':>14} {'speedup':>8}")
+    bench_email(message)
+    bench_slack(message)
+
+
+if __name__ == '__main__':
+    run()
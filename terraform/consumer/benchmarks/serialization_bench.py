@@ -0,0 +1,31 @@
+"""
+알림 메시지 직렬화/역직렬화 속도 및 크기 비교 (stdlib json vs orjson vs compact-v1)
+
+실행: consumer 디렉터리에서 PYTHONPATH=../modules/lambda/lambda-function python -m benchmarks.serialization_bench
+(notification_codec의 원본은 Lambda 소스에 있습니다)
+"""
+import timeit
+
+from benchmarks.messages import sample_notification
+from notification_codec import decode_compact, encode_compact, get_json_codec
+
+NUMBER = 100000
+
+
+def run():
+    message = sample_notification()
+    print(f"{'codec':<8} {'bytes':>6} {'encode us/msg':>14} {'decode us/msg':>14}")
+    codecs = [get_json_codec('json'), get_json_codec('orjson'), ('compact', encode_compact, decode_compact)]
+    for expected, (name, encode, decode) in zip(('json', 'orjson', 'compact'), codecs):
+        if name != expected:
+            print(f"{expected:<8} (not installed)")
+            continue
+        payload = encode(message)
+        assert decode(payload) == message
+        encode_seconds = timeit.timeit(lambda: encode(message), number=NUMBER)
+        decode_seconds = timeit.timeit(lambda: decode(payload), number=NUMBER)
+        print(f"{name:<8} {len(payload):>6} {encode_seconds / NUMBER * 1e6:>14.2f} {decode_seconds / NUMBER * 1e6:>14.2f}")
+
+
+if __name__ == '__main__':
+    run()
@@ -1,12 +1,67 @@
 import os
+import base64
 import logging
+import secrets
 import smtplib
+import threading
+from email.header import Header
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import Dict, Any
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+from channels.smtp_pool import SMTPConnectionPool
 
 logger = logging.getLogger(__name__)
 
+# 단건 알림 메일의 MIME 골격. 메시지마다 MIMEMultipart를 만들고 직렬화하는 대신
+# 핸들러 생성 시 한 번 만든 골격에 제목과 base64 본문만 채워 넣습니다.
+_EMAIL_TEMPLATE = (
+    'Content-Type: multipart/alternative; boundary="{boundary}"\n'
+    'MIME-Version: 1.0\n'
+    'Subject: {{subject}}\n'
+    'From: {sender}\n'
+    'To: {recipient}\n'
+    '\n'
+    '--{boundary}\n'
+    'Content-Type: text/plain; charset="utf-8"\n'
+    'MIME-Version: 1.0\n'
+    'Content-Transfer-Encoding: base64\n'
+    '\n'
+    '{{text_body}}'
+    '--{boundary}\n'
+    'Content-Type: text/html; charset="utf-8"\n'
+    'MIME-Version: 1.0\n'
+    'Content-Transfer-Encoding: base64\n'
+    '\n'
+    '{{html_body}}'
+    '--{boundary}--\n'
+)
+
+_HTML_BODY_TEMPLATE = """
+        <html>
+          <body>
+            <h2>New File Uploaded to S3</h2>
+            <p>File Name: {file_name}<br/>
+               Bucket: {bucket_name}<br/>
+               File Size: {file_size}<br/>
+               Upload Time: {upload_time}</p>
+            {link}
+          </body>
+        </html>
+        """
+_TEXT_BODY_TEMPLATE = "New File Uploaded to S3\nFile Name: {file_name}\nBucket: {bucket_name}\nFile Size: {file_size}\nUpload Time: {upload_time}\n{link}"
+
+
+def _encode_subject(subject: str) -> str:
+    """
+    제목의 줄바꿈(CR/LF)을 공백으로 바꿔 헤더 주입을 막고, Header로 인코딩/폴딩한 값을 반환합니다.
+    (파일 이름 등 메시지 값이 제목에 그대로 들어가므로)
+    """
+    subject = ' '.join(str(subject).splitlines())
+    charset = 'us-ascii' if subject.isascii() else 'utf-8'
+    return Header(subject, charset, header_name='Subject').encode()
+
+
 class EmailHandler:
     def __init__(self):
         self.smtp_server = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
@@ -18,48 +73,164 @@ class EmailHandler:
         if not all([self.sender_email, self.sender_password, self.recipient_email]):
             raise ValueError("EMAIL_SENDER, EMAIL_PASSWORD, EMAIL_RECIPIENT environment variables are required")
 
+        self.recipients = [email.strip() for email in self.recipient_email.split(',')]
+        # 보내는 사람/받는 사람/boundary가 채워진 메일 골격 (메시지마다 제목과 본문만 채움)
+        self._email_template = _EMAIL_TEMPLATE.format(
+            boundary='=' * 15 + secrets.token_hex(16) + '==', sender=self.sender_email, recipient=self.recipient_email
+        )
+
+        # 로그인된 SMTP 세션을 재사용하는 커넥션 풀 (메시지마다 TLS 핸드셰이크/로그인을 하지 않도록)
+        self.smtp_pool = SMTPConnectionPool(
+            self.smtp_server, self.smtp_port, self.sender_email, self.sender_password,
+            max_size=int(os.getenv('SMTP_POOL_SIZE', 2)),
+            idle_timeout=float(os.getenv('SMTP_IDLE_TIMEOUT_SECONDS', 60))
+        )
+
+        # 다이제스트 모드: (수신자, category) 단위로 메시지를 모아 한 통의 메일로 보냅니다.
+        # EMAIL_DIGEST_WINDOW_SECONDS가 지나거나 EMAIL_DIGEST_MAX_MESSAGES개가 모이면 전송합니다.
+        self.digest_enabled = os.getenv('EMAIL_DIGEST_ENABLED', 'false').lower() == 'true'
+        self.digest_window = float(os.getenv('EMAIL_DIGEST_WINDOW_SECONDS', 60))
+        self.digest_max_messages = int(os.getenv('EMAIL_DIGEST_MAX_MESSAGES', 100))
+        self._digest_buffers: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        self._digest_timers: Dict[Tuple[str, str], threading.Timer] = {}
+        self._digest_lock = threading.Lock()
+        # 다이제스트 전송에 실패한 메시지를 넘겨받는 콜백 (서비스가 재시도 큐로 연결합니다)
+        # 다이제스트에 넣은 메시지는 오프셋이 이미 커밋되었으므로, 콜백이 없으면 실패한 메시지는 로그로만 남습니다.
+        self.on_flush_failure: Optional[Callable[[List[Dict[str, Any]], str], None]] = None
+
         logger.info(f"Email handler initialized - sending from {self.sender_email} to {self.recipient_email}")
 
-    def send_notification(self, message: Dict[str, Any]) -> None:
-        try:
-            email_msg = self._create_email_message(message)
-            recipients = [email.strip() for email in self.recipient_email.split(',')]
+    @property
+    def buffering(self) -> bool:
+        return self.digest_enabled
+
+    @buffering.setter
+    def buffering(self, enabled: bool) -> None:
+        self.digest_enabled = enabled
 
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.sender_email, self.sender_password)
-                server.sendmail(self.sender_email, recipients, email_msg.as_string())
+    def send_notification(self, message: Dict[str, Any], buffered: bool = True) -> None:
+        """
+        알림 메일을 보냅니다. 다이제스트 모드이면 버퍼에 넣고 바로 반환합니다.
+        buffered=False이면 다이제스트 모드여도 바로 보냅니다. (재시도 큐에서 다시 보낼 때)
+        """
+        if self.digest_enabled and buffered:
+            self._add_to_digest(message)
+            return
 
-            logger.info(f"Email notification sent successfully to {len(recipients)} recipients")
+        try:
+            self._sendmail(self.recipients, self._create_email_message(message))
+
+            logger.debug(f"Email notification sent successfully to {len(self.recipients)} recipients")
         except Exception as e:
             logger.error(f"Failed to send email: {e}")
             raise
 
-    def _create_email_message(self, message: Dict[str, Any]) -> MIMEMultipart:
+    def flush(self) -> None:
+        """버퍼에 남아 있는 다이제스트를 모두 즉시 전송합니다."""
+        with self._digest_lock:
+            keys = list(self._digest_buffers)
+        for key in keys:
+            self._flush_digest(key)
+
+    def close(self) -> None:
+        self.flush()
+        self.smtp_pool.close()
+
+    def _add_to_digest(self, message: Dict[str, Any]) -> None:
+        key = (self.recipient_email, message.get('category', 'general'))
+        with self._digest_lock:
+            buffer = self._digest_buffers.setdefault(key, [])
+            buffer.append(message)
+            is_full = len(buffer) >= self.digest_max_messages
+            if not is_full and key not in self._digest_timers:
+                timer = threading.Timer(self.digest_window, self._flush_digest, args=(key,))
+                timer.daemon = True
+                self._digest_timers[key] = timer
+                timer.start()
+        if is_full:
+            self._flush_digest(key)
+
+    def _flush_digest(self, key: Tuple[str, str]) -> None:
+        with self._digest_lock:
+            messages = self._digest_buffers.pop(key, [])
+            timer = self._digest_timers.pop(key, None)
+        if timer:
+            timer.cancel()
+        if not messages:
+            return
+
+        recipient_email, category = key
+        try:
+            recipients = self.recipients
+            email_msg = self._create_digest_message(messages, category, recipient_email)
+            self._sendmail(recipients, email_msg.as_string())
+            logger.info(f"Email digest with {len(messages)} files ({category}) sent successfully to {len(recipients)} recipients")
+        except Exception as e:
+            logger.error(f"Failed to send email digest with {len(messages)} files ({category}): {e}")
+            if self.on_flush_failure:
+                self.on_flush_failure(messages, str(e))
+
+    def _sendmail(self, recipients, email_body: str) -> None:
+        try:
+            with self.smtp_pool.connection() as server:
+                server.sendmail(self.sender_email, recipients, email_body)
+        except (smtplib.SMTPServerDisconnected, ConnectionError):
+            # 풀에 있던 세션이 서버 쪽에서 끊긴 경우 새 세션으로 한 번 더 시도합니다.
+            logger.warning("SMTP session was disconnected, retrying with a new session")
+            with self.smtp_pool.connection() as server:
+                server.sendmail(self.sender_email, recipients, email_body)
+
+    def _extract_fields(self, message: Dict[str, Any]) -> Tuple[str, str, Any, str, str]:
         file_name = message.get('fileName', 'Unknown file')
         bucket_name = message.get('bucketName', 'Unknown bucket')
         file_size = message.get('fileSize', 'Unknown size')
         upload_time = message.get('uploadTime', 'Unknown time')
         view_url = message.get('httpUrl', message.get('s3Url', ''))
+        return file_name, bucket_name, file_size, upload_time, view_url
 
+    def _create_email_message(self, message: Dict[str, Any]) -> str:
+        """
+        미리 만들어 둔 MIME 골격에 제목과 본문을 채워 전송 가능한 메일 문자열을 반환합니다.
+        """
+        file_name, bucket_name, file_size, upload_time, view_url = self._extract_fields(message)
+        fields = {'file_name': file_name, 'bucket_name': bucket_name, 'file_size': file_size, 'upload_time': upload_time}
+
+        subject = _encode_subject(f"New File Uploaded: {file_name}")
+        html_body = _HTML_BODY_TEMPLATE.format(link=f'<a href="{view_url}">View File in S3</a>' if view_url else '', **fields)
+        text_body = _TEXT_BODY_TEMPLATE.format(link=f'View File: {view_url}' if view_url else '', **fields)
+
+        return self._email_template.format(
+            subject=subject,
+            text_body=base64.encodebytes(text_body.encode('utf-8')).decode('ascii'),
+            html_body=base64.encodebytes(html_body.encode('utf-8')).decode('ascii'),
+        )
+
+    def _create_digest_message(self, messages: List[Dict[str, Any]], category: str, recipient_email: str) -> MIMEMultipart:
         msg = MIMEMultipart('alternative')
-        msg['Subject'] = f"New File Uploaded: {file_name}"
+        msg['Subject'] = _encode_subject(f"{len(messages)} New Files Uploaded ({category})")
         msg['From'] = self.sender_email
-        msg['To'] = self.recipient_email
+        msg['To'] = recipient_email
+
+        html_rows = []
+        text_rows = []
+        for message in messages:
+            file_name, bucket_name, file_size, upload_time, view_url = self._extract_fields(message)
+            file_cell = f'<a href="{view_url}">{file_name}</a>' if view_url else file_name
+            html_rows.append(f"<tr><td>{file_cell}</td><td>{bucket_name}</td><td>{file_size}</td><td>{upload_time}</td></tr>")
+            text_rows.append(f"- {file_name} | {bucket_name} | {file_size} | {upload_time}{f' | {view_url}' if view_url else ''}")
 
         html_body = f"""
         <html>
           <body>
-            <h2>New File Uploaded to S3</h2>
-            <p>File Name: {file_name}<br/>
-               Bucket: {bucket_name}<br/>
-               File Size: {file_size}<br/>
-               Upload Time: {upload_time}</p>
-            {f'<a href="{view_url}">View File in S3</a>' if view_url else ''}
+            <h2>{len(messages)} New Files Uploaded to S3 ({category})</h2>
+            <table border="1" cellpadding="4" cellspacing="0">
+              <tr><th>File Name</th><th>Bucket</th><th>File Size</th><th>Upload Time</th></tr>
+              {''.join(html_rows)}
+            </table>
           </body>
         </html>
         """
-        text_body = f"New File Uploaded to S3\nFile Name: {file_name}\nBucket: {bucket_name}\nFile Size: {file_size}\nUpload Time: {upload_time}\n{f'View File: {view_url}' if view_url else ''}"
+        text_body = f"{len(messages)} New Files Uploaded to S3 ({category})\n" + "\n".join(text_rows)
 
         msg.attach(MIMEText(text_body, 'plain'))
         msg.attach(MIMEText(html_body, 'html'))
@@ -0,0 +1,41 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    스레드 안전한 토큰 버킷 레이트 리미터입니다.
+
+    초당 rate개의 토큰이 채워지고 최대 burst개까지 쌓입니다. acquire()는 토큰이 생길 때까지 대기합니다.
+    서버가 Retry-After를 돌려주면 pause()로 그 시간 동안 모든 요청을 멈춥니다.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    wait_seconds = self._paused_until - now
+                else:
+                    self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+                    self._updated_at = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait_seconds = (1 - self._tokens) / self.rate
+            time.sleep(wait_seconds)
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            # 멈춘 시간 동안에는 토큰이 채워지지 않도록 합니다.
+            self._tokens = 0
+            self._updated_at = self._paused_until
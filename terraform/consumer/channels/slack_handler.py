@@ -1,12 +1,45 @@
 import os
 import json # json 라이브러리 import가 필요합니다.
 import logging
-from typing import Dict, Any
+import threading
+from typing import Callable, Dict, Any, List, Optional
 from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 
+from channels.rate_limiter import TokenBucket
+
 logger = logging.getLogger(__name__)
 
+# Slack 메시지 하나에 넣을 수 있는 최대 block 수
+SLACK_MAX_BLOCKS = 50
+
+# 카테고리별 헤더 문구. 메시지마다 분기하지 않고 버전만 이어 붙입니다.
+_HEADER_PREFIXES = {
+    "positive": "💡 긍정 리뷰 분석 보고서_",
+    "negative": "💡 부정 리뷰 분석 보고서_",
+    "feedback": "💡 피드백 개선 보고서_",
+}
+_DEFAULT_HEADER_PREFIX = "💡 신규 파일 업로드 알림_"
+
+# 메시지마다 값이 바뀌지 않는 block들은 한 번만 만들어 공유합니다. (slack_sdk는 blocks를 수정하지 않습니다)
+_DIVIDER_BLOCK = {"type": "divider"}
+_VIEW_BUTTON_TEXT = {"type": "plain_text", "text": "View in S3"}
+
+def _retry_after_seconds(headers, default: float = 1.0) -> float:
+    """
+    429 응답의 Retry-After 값을 초 단위로 반환합니다.
+    HTTP 헤더 이름은 대소문자를 구분하지 않으므로 (slack_sdk의 RateLimitErrorRetryHandler처럼) 소문자로 비교합니다.
+    """
+    for name, value in (headers or {}).items():
+        if name.lower() == 'retry-after':
+            if isinstance(value, (list, tuple)):
+                value = value[0] if value else None
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                return default
+    return default
+
 class SlackHandler:
     def __init__(self):
         self.bot_token = os.getenv('SLACK_BOT_TOKEN')
@@ -28,7 +61,35 @@ class SlackHandler:
             logger.warning("SLACK_CHANNEL_MAP not set. Using default.")
             self.channel_map = {"general": "#general"}
 
-    def send_notification(self, message: Dict[str, Any]) -> None:
+        # 채널별 토큰 버킷 (chat.postMessage는 채널당 초당 1건 정도로 제한됩니다)
+        self.rate_per_second = float(os.getenv('SLACK_RATE_PER_SECOND', 1))
+        self.rate_burst = int(os.getenv('SLACK_RATE_BURST', 3))
+        self.max_retries = int(os.getenv('SLACK_MAX_RETRIES', 3))
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._buckets_lock = threading.Lock()
+
+        # 배치 모드: target_channel 단위로 SLACK_BATCH_WINDOW_SECONDS 동안 모은 파일 알림을 한 메시지로 합칩니다.
+        self.batch_enabled = os.getenv('SLACK_BATCH_ENABLED', 'false').lower() == 'true'
+        self.batch_window = float(os.getenv('SLACK_BATCH_WINDOW_SECONDS', 5))
+        self._batch_buffers: Dict[str, List[Dict[str, Any]]] = {}
+        self._batch_timers: Dict[str, threading.Timer] = {}
+        self._batch_lock = threading.Lock()
+        # 배치 전송에 실패한 메시지를 넘겨받는 콜백 (서비스가 재시도 큐로 연결합니다)
+        self.on_flush_failure: Optional[Callable[[List[Dict[str, Any]], str], None]] = None
+
+    @property
+    def buffering(self) -> bool:
+        return self.batch_enabled
+
+    @buffering.setter
+    def buffering(self, enabled: bool) -> None:
+        self.batch_enabled = enabled
+
+    def send_notification(self, message: Dict[str, Any], buffered: bool = True) -> None:
+        """
+        category에 맞는 Slack 채널로 알림을 보냅니다. 배치 모드이면 버퍼에 넣고 바로 반환합니다.
+        buffered=False이면 배치 모드여도 바로 보냅니다. (재시도 큐에서 다시 보낼 때)
+        """
         # 1. 메시지에서 'category'를 가져옵니다. 없으면 'general'을 기본값으로 사용합니다.
         category = message.get("category", "general")
 
@@ -40,10 +101,14 @@ class SlackHandler:
             logger.error(f"No Slack channel found for category '{category}' or default. Cannot send message.")
             return
         
+        if self.batch_enabled and buffered:
+            self._add_to_batch(target_channel, message)
+            return
+
         try:
             blocks = self._format_message(message, category)
-            response = self.client.chat_postMessage(channel=target_channel, blocks=blocks, text=f"New report uploaded: {message.get('fileName')}")
-            logger.info(f"Slack message sent successfully to channel '{target_channel}': {response['ts']}")
+            response = self._post_message(target_channel, blocks, f"New report uploaded: {message.get('fileName')}")
+            logger.debug(f"Slack message sent successfully to channel '{target_channel}': {response['ts']}")
         except SlackApiError as e:
             logger.error(f"Slack API error sending to channel '{target_channel}': {e.response['error']}")
             raise
@@ -51,6 +116,98 @@ class SlackHandler:
             logger.error(f"Unexpected error sending Slack message to channel '{target_channel}': {e}")
             raise
 
+    def flush(self) -> None:
+        """배치 버퍼에 남아 있는 알림을 모두 즉시 전송합니다."""
+        with self._batch_lock:
+            channels = list(self._batch_buffers)
+        for target_channel in channels:
+            self._flush_batch(target_channel)
+
+    def close(self) -> None:
+        self.flush()
+
+    def _get_bucket(self, target_channel: str) -> TokenBucket:
+        with self._buckets_lock:
+            bucket = self._buckets.get(target_channel)
+            if bucket is None:
+                bucket = self._buckets[target_channel] = TokenBucket(self.rate_per_second, self.rate_burst)
+            return bucket
+
+    def _post_message(self, target_channel: str, blocks: list, text: str):
+        """
+        채널별 레이트 리미터를 거쳐 메시지를 보냅니다.
+        429(ratelimited) 응답을 받으면 Retry-After 만큼 해당 채널을 멈춘 뒤 최대 max_retries번 재시도합니다.
+        """
+        bucket = self._get_bucket(target_channel)
+        attempt = 0
+        while True:
+            bucket.acquire()
+            try:
+                return self.client.chat_postMessage(channel=target_channel, blocks=blocks, text=text)
+            except SlackApiError as e:
+                if e.response.status_code != 429 or attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                retry_after = _retry_after_seconds(e.response.headers)
+                logger.warning(f"Slack rate limited on channel '{target_channel}', retrying in {retry_after}s ({attempt}/{self.max_retries})")
+                bucket.pause(retry_after)
+
+    def _add_to_batch(self, target_channel: str, message: Dict[str, Any]) -> None:
+        with self._batch_lock:
+            self._batch_buffers.setdefault(target_channel, []).append(message)
+            if target_channel not in self._batch_timers:
+                timer = threading.Timer(self.batch_window, self._flush_batch, args=(target_channel,))
+                timer.daemon = True
+                self._batch_timers[target_channel] = timer
+                timer.start()
+
+    def _flush_batch(self, target_channel: str) -> None:
+        with self._batch_lock:
+            messages = self._batch_buffers.pop(target_channel, [])
+            timer = self._batch_timers.pop(target_channel, None)
+        if timer:
+            timer.cancel()
+
+        # header + divider 를 제외한 나머지 block에 파일을 하나씩 담고, 넘치면 여러 메시지로 나눕니다.
+        files_per_message = SLACK_MAX_BLOCKS - 2
+        for i in range(0, len(messages), files_per_message):
+            chunk = messages[i:i + files_per_message]
+            try:
+                blocks = self._format_batch_message(chunk)
+                response = self._post_message(target_channel, blocks, f"{len(chunk)} new reports uploaded")
+                logger.info(f"Slack batch message with {len(chunk)} files sent successfully to channel '{target_channel}': {response['ts']}")
+            except SlackApiError as e:
+                logger.error(f"Slack API error sending batch of {len(chunk)} files to channel '{target_channel}': {e.response['error']}")
+                if self.on_flush_failure:
+                    self.on_flush_failure(chunk, str(e))
+            except Exception as e:
+                logger.error(f"Unexpected error sending Slack batch of {len(chunk)} files to channel '{target_channel}': {e}")
+                if self.on_flush_failure:
+                    self.on_flush_failure(chunk, str(e))
+
+    def _format_batch_message(self, messages: List[Dict[str, Any]]) -> list:
+        blocks = [
+            {
+                "type": "header",
+                "text": {"type": "plain_text", "text": f"💡 신규 파일 업로드 알림 ({len(messages)}건)"}
+            },
+            _DIVIDER_BLOCK,
+        ]
+        for message in messages:
+            file_name = message.get('fileName', 'Unknown file')
+            file_size = message.get('fileSize', 'Unknown size')
+            upload_time = message.get('uploadTime', 'Unknown time')
+            view_url = message.get('httpUrl', message.get('s3Url', ''))
+            file_text = f"<{view_url}|{file_name}>" if view_url else file_name
+            blocks.append({
+                "type": "section",
+                "text": {
+                    "type": "mrkdwn",
+                    "text": f"*{file_text}*\n{file_size} bytes · {upload_time}"
+                }
+            })
+        return blocks
+
     def _format_message(self, message: Dict[str, Any], category: str) -> list:
         file_name = message.get('fileName', 'Unknown file')
         file_size = message.get('fileSize', 'Unknown size')
@@ -58,15 +215,8 @@ class SlackHandler:
         view_url = message.get('httpUrl', message.get('s3Url', ''))
         version = message.get("version", "Unknown version")
 
-        header_text = f"💡 신규 파일 업로드 알림_{version}" # 기본값
-        if category == "positive":
-            header_text = f"💡 긍정 리뷰 분석 보고서_{version}"
-        elif category == "negative":
-            header_text = f"💡 부정 리뷰 분석 보고서_{version}"
-        elif category == "feedback":
-            header_text = f"💡 피드백 개선 보고서_{version}"
+        header_text = f"{_HEADER_PREFIXES.get(category, _DEFAULT_HEADER_PREFIX)}{version}"
 
-       
         blocks = [
             # 헤더: 무슨 일인지 요약
             {
@@ -74,7 +224,7 @@ class SlackHandler:
                 "text": {"type": "plain_text", "text": header_text}
             },
             # 구분선
-            {"type": "divider"},
+            _DIVIDER_BLOCK,
             # 본문 1: 가장 중요한 정보인 '파일 이름'을 링크와 함께 강조
             {
                 "type": "section",
@@ -93,11 +243,10 @@ class SlackHandler:
             }
         ]
 
-
         if view_url:
             blocks.append({
                 "type": "actions",
-                "elements": [{"type": "button", "text": {"type": "plain_text", "text": "View in S3"}, "url": view_url, "style": "primary"}]
+                "elements": [{"type": "button", "text": _VIEW_BUTTON_TEXT, "url": view_url, "style": "primary"}]
             })
 
         return blocks
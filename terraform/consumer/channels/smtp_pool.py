@@ -0,0 +1,145 @@
+import logging
+import smtplib
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class SMTPConnectionPool:
+    """
+    로그인까지 마친 SMTP 세션을 재사용하기 위한 작은 커넥션 풀입니다.
+
+    - 최대 max_size개의 세션을 유지하고, 모두 사용 중이면 반납될 때까지 기다립니다.
+    - health_check_interval초 이상 쉬었던 세션은 꺼내기 전에 NOOP으로 상태를 확인합니다.
+    - idle_timeout초 이상 사용되지 않은 세션은 백그라운드 스레드가 정리합니다.
+    """
+
+    def __init__(self, host: str, port: int, username: str, password: str,
+                 max_size: int = 2, idle_timeout: float = 60, health_check_interval: float = 10,
+                 connect_timeout: float = 30):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.connect_timeout = connect_timeout
+
+        self._idle = deque()  # (smtp, 마지막 사용 시각)
+        self._size = 0
+        self._cond = threading.Condition()
+        self._closed = threading.Event()
+        self._reaper = threading.Thread(target=self._reap_idle, name='smtp-pool-reaper', daemon=True)
+        self._reaper.start()
+
+    @contextmanager
+    def connection(self):
+        """
+        풀에서 세션을 하나 빌려줍니다. 사용 중 예외가 발생하면 해당 세션은 닫고 버립니다.
+        """
+        smtp = self._acquire()
+        try:
+            yield smtp
+        except Exception:
+            self._discard(smtp)
+            raise
+        else:
+            self._release(smtp)
+
+    def close(self) -> None:
+        self._closed.set()
+        with self._cond:
+            while self._idle:
+                smtp, _ = self._idle.pop()
+                self._size -= 1
+                self._quit(smtp)
+            self._cond.notify_all()
+
+    def _connect(self) -> smtplib.SMTP:
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.connect_timeout)
+        try:
+            smtp.starttls()
+            smtp.login(self.username, self.password)
+        except Exception:
+            self._quit(smtp)
+            raise
+        logger.info(f"Opened new SMTP session to {self.host}:{self.port}")
+        return smtp
+
+    def _is_healthy(self, smtp: smtplib.SMTP) -> bool:
+        try:
+            return smtp.noop()[0] == 250
+        except smtplib.SMTPException:
+            return False
+        except OSError:
+            return False
+
+    def _acquire(self) -> smtplib.SMTP:
+        with self._cond:
+            while True:
+                if self._idle:
+                    smtp, last_used = self._idle.pop()
+                    idle_for = time.monotonic() - last_used
+                    if idle_for < self.health_check_interval:
+                        return smtp
+                    # 오래 쉬었던 세션은 서버가 끊었을 수 있으므로 상태를 확인합니다.
+                    if self._is_healthy(smtp):
+                        return smtp
+                    logger.info("Discarding stale SMTP session")
+                    self._size -= 1
+                    self._quit(smtp)
+                    continue
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                self._cond.wait()
+
+        # 새 연결(TLS + 로그인)은 락 밖에서 수행합니다.
+        try:
+            return self._connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+    def _release(self, smtp: smtplib.SMTP) -> None:
+        with self._cond:
+            if self._closed.is_set():
+                self._size -= 1
+                self._quit(smtp)
+            else:
+                self._idle.append((smtp, time.monotonic()))
+            self._cond.notify()
+
+    def _discard(self, smtp: smtplib.SMTP) -> None:
+        self._quit(smtp)
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    def _quit(self, smtp: smtplib.SMTP) -> None:
+        try:
+            smtp.quit()
+        except Exception:
+            smtp.close()
+
+    def _reap_idle(self) -> None:
+        while not self._closed.wait(max(self.idle_timeout / 2, 1)):
+            expired = []
+            with self._cond:
+                now = time.monotonic()
+                # deque 앞쪽이 가장 오래 쉰 세션입니다.
+                while self._idle and now - self._idle[0][1] >= self.idle_timeout:
+                    expired.append(self._idle.popleft()[0])
+                    self._size -= 1
+                if expired:
+                    self._cond.notify_all()
+            for smtp in expired:
+                self._quit(smtp)
+            if expired:
+                logger.info(f"Closed {len(expired)} idle SMTP session(s)")
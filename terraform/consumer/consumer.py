@@ -1,46 +1,102 @@
 import os
-import json
+import functools
 import logging
+import multiprocessing
+import signal
 import sys
-from typing import Dict, Any
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, Any, List
 
-from kafka import KafkaConsumer
-from aws_msk_iam_sasl_signer import MSKAuthTokenProvider
+from kafka import KafkaConsumer, KafkaProducer, ConsumerRebalanceListener, TopicPartition
+from msk_token_provider import CachedMSKTokenProvider
+from dedup import CLAIMED, PROCESSING, create_deduplicator
+from log_config import LogSampler, configure_logging
+from metrics import ConsumerMetrics, mark_worker_dead, start_metrics_server
+from retry import KafkaDeadLetterSink, LogDeadLetterSink, RetryPolicy, RetryScheduler, SqliteRetryStore
+from notification_codec import CODEC_NAME, decode_record
 
 from channels.slack_handler import SlackHandler
 from channels.email_handler import EmailHandler 
 
-# 로깅 설정
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# 로깅 설정 (LOG_FORMAT=json 이면 JSON 한 줄, 출력은 별도 스레드에서 수행)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 
-# MSK IAM 인증 토큰을 동적으로 제공하는 클래스 (AWS 공식 문서 방식)
-class MSKTokenProvider:
-    def __init__(self, region: str):
-        self.region = region
+class ServiceRebalanceListener(ConsumerRebalanceListener):
+    """
+    리밸런스 시점에 서비스로 알려주는 리스너입니다.
+    파티션을 빼앗기기 전에 처리가 끝난 오프셋을 커밋하여 다른 워커가 같은 메시지를 다시 보내지 않도록 합니다.
+    """
+
+    def __init__(self, service: 'KafkaToChannelsService'):
+        self.service = service
+
+    def on_partitions_revoked(self, revoked):
+        self.service.on_partitions_revoked(revoked)
+
+    def on_partitions_assigned(self, assigned):
+        self.service.on_partitions_assigned(assigned)
 
-    def token(self) -> str:
-        """
-        kafka-python 라이브러리가 인증 토큰을 필요로 할 때마다 이 메서드를 호출합니다.
-        자동으로 새 토큰을 생성하여 반환하므로 토큰 만료를 걱정할 필요가 없습니다.
-        """
-        token, _ = MSKAuthTokenProvider.generate_auth_token(self.region)
-        logger.info("Successfully generated new MSK IAM Auth Token.")
-        return token
+
+class OrderedSend:
+    """
+    배치의 메시지를 파티션 순서대로 하나씩 보내고, 앞에서부터 몇 건이 전달됐는지 기록합니다.
+    중간에 실패하면 sent 이후의 메시지만 다시 보내면 되고, cancel() 하면 현재 메시지 다음부터 보내지 않습니다.
+    """
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.sent = 0
+        self._cancelled = False
+
+    def __call__(self, messages: List[Dict[str, Any]]) -> None:
+        for message in messages:
+            if self._cancelled:
+                raise RuntimeError(f"ordered send cancelled after {self.sent} message(s)")
+            self.handler.send_notification(message)
+            self.sent += 1
+
+    def cancel(self) -> None:
+        self._cancelled = True
 
 
 class KafkaToChannelsService:
-    def __init__(self):
+    def __init__(self, worker_id: int = 0):
+        self.worker_id = worker_id
+
         # 환경변수 읽기
         self.kafka_bootstrap_servers = os.getenv('MSK_BOOTSTRAP_SERVERS')
         self.kafka_topics = os.getenv('MSK_TOPIC', 'fanda-notifications').split(",")
         self.kafka_group_id = os.getenv('MSK_CONSUMER_GROUP', 'msk-consumer-group')
         self.region = os.getenv('AWS_REGION', 'us-east-1')
 
+        # 오프셋 커밋 방식
+        # manual: poll()로 가져온 배치를 모두 채널에 전달한 뒤에만 비동기로 커밋합니다. (at-least-once)
+        # auto  : kafka-python의 auto commit 타이머를 사용합니다. (기존 동작)
+        self.commit_mode = os.getenv('CONSUMER_COMMIT_MODE', 'manual')
+        self.max_poll_records = int(os.getenv('MAX_POLL_RECORDS', 100))
+        self.poll_timeout_ms = int(os.getenv('POLL_TIMEOUT_MS', 1000))
+        # 처리량(records/sec, 평균 배치 크기)을 로그로 남기는 주기
+        self.throughput_log_interval = float(os.getenv('THROUGHPUT_LOG_INTERVAL_SECONDS', 30))
+        # 커밋 요청을 최소 이 간격만큼 모아서 보냅니다.
+        self.commit_interval = float(os.getenv('COMMIT_INTERVAL_MS', 5000)) / 1000
+        self._has_uncommitted = False
+        self._commit_in_flight = False
+        self._last_commit_time = 0.0
+        # 전송에 실패한 배치는 시작 오프셋으로 되돌린 뒤, 이 시간 동안 해당 파티션을 멈췄다가 다시 가져옵니다.
+        self.batch_retry_backoff = float(os.getenv('BATCH_RETRY_BACKOFF_MS', 5000)) / 1000
+        self._paused_until: Dict[TopicPartition, float] = {}
+
+        # 메시지 단위 로그는 LOG_SAMPLE_RATE 비율만큼만 남깁니다. (전송 실패는 항상 남김)
+        self.log_sampler = LogSampler(float(os.getenv('LOG_SAMPLE_RATE', 1.0)))
+
+        # Prometheus 지표 (METRICS_ENABLED=false 이거나 prometheus_client가 없으면 기록하지 않습니다)
+        self.metrics = ConsumerMetrics(enabled=metrics_enabled(), worker=worker_id)
+
         # Kafka Consumer 생성
         self.consumer = self._create_kafka_consumer()
 
@@ -52,33 +108,114 @@ class KafkaToChannelsService:
         if 'email' in enabled_channels:
             self.handlers['email'] = EmailHandler()
 
+        # 채널별 워커 풀 (채널마다 동시 전송 수 제한, 느린 채널이 다른 채널을 막지 않도록 분리)
+        # <CHANNEL>_MAX_CONCURRENCY 로 채널별 값을 지정할 수 있습니다. 예: EMAIL_MAX_CONCURRENCY=2
+        self.channel_send_timeout = float(os.getenv('CHANNEL_SEND_TIMEOUT_SECONDS', 30))
+        default_concurrency = int(os.getenv('CHANNEL_MAX_CONCURRENCY', 4))
+        # true이면 한 파티션 배치 안의 메시지를 채널별로 순서대로 보냅니다. (Producer의 키 기반 파티셔닝과 함께 사용)
+        self.preserve_partition_order = os.getenv('PRESERVE_PARTITION_ORDER', 'false').lower() == 'true'
+        # 타임아웃 후에도 채널 워커에서 계속 실행 중인 전송 {future: (채널, 메시지 목록)}
+        self._late_sends: Dict[Any, Any] = {}
+        self._late_sends_lock = threading.Lock()
+        self.executors = {
+            channel_name: ThreadPoolExecutor(
+                max_workers=int(os.getenv(f'{channel_name.upper()}_MAX_CONCURRENCY', default_concurrency)),
+                thread_name_prefix=f'channel-{channel_name}'
+            )
+            for channel_name in self.handlers
+        }
+
+        # 중복 알림 제거 (REDIS_URL이 있으면 ElastiCache, 없으면 프로세스 내부 저장소)
+        self.deduplicator = None
+        if os.getenv('DEDUP_ENABLED', 'true').lower() == 'true':
+            self.deduplicator = create_deduplicator(
+                os.getenv('REDIS_URL'),
+                ttl_seconds=int(os.getenv('DEDUP_TTL_SECONDS', 86400)),
+                local_cache_size=int(os.getenv('DEDUP_LOCAL_CACHE_SIZE', 10000)),
+                # 전송 중인 알림의 선점 유지 시간 (전송이 끝나면 DEDUP_TTL_SECONDS로 연장)
+                processing_ttl_seconds=int(os.getenv('DEDUP_PROCESSING_TTL_SECONDS', 300)),
+                # REDIS_URL이 없을 때 프로세스 내부 저장소에 보관할 최대 키 수
+                max_entries=int(os.getenv('DEDUP_MAX_ENTRIES', 50000))
+            )
+
+        # 전송 실패 재시도 (실패한 채널/알림만 로컬 SQLite 큐에 넣고 백그라운드에서 백오프 후 재전송)
+        self.retry_scheduler = None
+        if os.getenv('RETRY_ENABLED', 'true').lower() == 'true':
+            self.retry_scheduler = self._create_retry_scheduler()
+
+        # 다이제스트/배치처럼 버퍼에 모았다가 나중에 보내는 핸들러는, 보낼 때 실패한 메시지를 재시도 큐로 넘깁니다.
+        # 버퍼에 넣은 시점에 오프셋이 커밋되므로 재시도 큐가 없으면 버퍼링을 끄고 바로 보냅니다.
+        for channel_name, handler in self.handlers.items():
+            if not hasattr(handler, 'on_flush_failure'):
+                continue
+            if self.retry_scheduler:
+                handler.on_flush_failure = functools.partial(self._on_flush_failure, channel_name)
+            elif handler.buffering:
+                logger.warning(f"Buffered sending for {channel_name} requires the retry queue (RETRY_ENABLED=true), sending immediately")
+                handler.buffering = False
+
         logger.info("Kafka to Channels service initialized")
         logger.info(f"Enabled channels: {list(self.handlers.keys())}")
 
     def _create_kafka_consumer(self) -> KafkaConsumer:
         try:
-            # 동적 토큰 제공자 인스턴스 생성
-            token_provider = MSKTokenProvider(region=self.region)
             consumer = KafkaConsumer(
-                *self.kafka_topics,
-                bootstrap_servers=self.kafka_bootstrap_servers,
-                security_protocol='SASL_SSL',
-                # Python 클라이언트는 OAUTHBEARER 메커니즘을 사용합니다.
-                sasl_mechanism='OAUTHBEARER',
-                # 정적 비밀번호 대신 동적 토큰 제공자를 지정합니다.
-                sasl_oauth_token_provider=token_provider,
+                **self._kafka_auth_config(),
                 group_id=self.kafka_group_id,
                 auto_offset_reset='earliest',
-                enable_auto_commit=True,
-                value_deserializer=lambda x: json.loads(x.decode('utf-8')),
-
+                enable_auto_commit=self.commit_mode == 'auto',
+                max_poll_records=self.max_poll_records,
+                # 값은 레코드 헤더의 포맷(JSON/compact)에 맞춰 _decode_records()에서 디코딩합니다.
+                # 사용하지 않는 키/크기 계산은 건너뛰고, 읽는 필드만 그때 계산합니다.
+                lazy_records=True,
             )
-            logger.info(f"Kafka consumer subscribed to topics: {self.kafka_topics}")
+            # 리밸런스 리스너와 함께 구독합니다. (같은 그룹의 워커/파드끼리 파티션을 나눠 가집니다)
+            consumer.subscribe(topics=self.kafka_topics, listener=ServiceRebalanceListener(self))
+            logger.info(f"Kafka consumer subscribed to topics: {self.kafka_topics} (codec: {CODEC_NAME})")
             return consumer
         except Exception as e:
             logger.error(f"Failed to create Kafka consumer: {e}")
             raise
 
+    def _kafka_auth_config(self) -> Dict[str, Any]:
+        # Python 클라이언트는 OAUTHBEARER 메커니즘과 동적 토큰 제공자(만료 직전까지 캐시, 백그라운드 갱신)를 사용합니다.
+        return {
+            'bootstrap_servers': self.kafka_bootstrap_servers,
+            'security_protocol': 'SASL_SSL',
+            'sasl_mechanism': 'OAUTHBEARER',
+            'sasl_oauth_token_provider': CachedMSKTokenProvider(region=self.region),
+        }
+
+    def _create_retry_scheduler(self) -> RetryScheduler:
+        retry_dir = os.getenv('RETRY_QUEUE_DIR', tempfile.gettempdir())
+        store = SqliteRetryStore(os.path.join(retry_dir, f'fanda-retry-{self.worker_id}.db'))
+        policy = RetryPolicy(
+            max_attempts=int(os.getenv('RETRY_MAX_ATTEMPTS', 5)),
+            base_delay=float(os.getenv('RETRY_BASE_DELAY_SECONDS', 2)),
+            max_delay=float(os.getenv('RETRY_MAX_DELAY_SECONDS', 300))
+        )
+        dead_letter_topic = os.getenv('DEAD_LETTER_TOPIC')
+        if dead_letter_topic:
+            dead_letter = KafkaDeadLetterSink(KafkaProducer(**self._kafka_auth_config()), dead_letter_topic)
+        else:
+            dead_letter = LogDeadLetterSink()
+        logger.info(f"Retry queue: {store.path} (max attempts {policy.max_attempts}, dead letter: {dead_letter_topic or 'log'})")
+        return RetryScheduler(store, policy, dead_letter, self._submit_retry, metrics=self.metrics)
+
+    def _submit_retry(self, channel_name: str, message: Dict[str, Any]):
+        handler = self.handlers[channel_name]
+        send = handler.send_notification
+        if hasattr(handler, 'on_flush_failure'):
+            # 재시도는 버퍼를 거치지 않고 바로 보내야 성공/실패가 재시도 큐에 반영됩니다.
+            send = functools.partial(send, buffered=False)
+        return self.executors[channel_name].submit(self._timed_send, channel_name, send, message, (message,))
+
+    def _on_flush_failure(self, channel_name: str, messages: List[Dict[str, Any]], error: str) -> None:
+        """버퍼링 핸들러가 모아 둔 메시지를 보내지 못했을 때 호출됩니다. (핸들러의 타이머/종료 스레드에서 실행)"""
+        self.metrics.send_errors_total.labels(channel_name, 'flush').inc()
+        for message in messages:
+            self.retry_scheduler.schedule(channel_name, message, error)
+
     def _convert_s3_to_http_url(self, s3_url: str) -> str:
         try:
             if s3_url.startswith('s3://'):
@@ -91,55 +228,478 @@ class KafkaToChannelsService:
             logger.error(f"Error converting S3 URL: {e}")
             return s3_url
 
-    def process_message(self, message: Dict[str, Any]) -> None:
+    def process_message(self, message: Dict[str, Any]) -> bool:
+        """
+        모든 채널에 메시지를 동시에 전송하고, 모든 채널의 결과가 나올 때까지 기다립니다.
+        모든 채널이 성공하면 True를 반환합니다. (오프셋 커밋은 이 함수가 반환된 뒤에 일어납니다.)
+        """
+        return self.process_batch([message])
+
+    def process_batch(self, messages: List[Dict[str, Any]]) -> bool:
+        """
+        한 파티션에서 가져온 메시지 배치를 채널 계층에 한 번에 넘깁니다.
+        send_notifications(messages)를 제공하는 핸들러는 배치 전체를 한 번에 받고,
+        그렇지 않은 핸들러는 채널 워커 풀에서 메시지별로 동시에 전송합니다.
+        모든 채널의 결과가 나올 때까지 기다리며, 모두 성공하면 True를 반환합니다.
+        재시도 큐를 사용하면 실패한 전송을 큐에 넣은 뒤 True를 반환합니다.
+        순서 보장 채널은 실패한 메시지부터 끝까지를 재시도 큐 대신 배치 재전달로 다시 보냅니다.
+        """
+        claimed = []
+        # 다른 워커가 아직 전송 중(PROCESSING)인 알림 수. 0이 아니면 배치를 미완료로 보고 나중에 다시 받습니다.
+        busy = 0
         try:
-            if 's3Url' in message:
-                message['httpUrl'] = self._convert_s3_to_http_url(message['s3Url'])
+            if self.deduplicator:
+                duplicates = 0
+                batch_keys = set()
+                for message in messages:
+                    key = self.deduplicator.make_key(message)
+                    if key in batch_keys:
+                        duplicates += 1
+                        continue
+                    batch_keys.add(key)
+                    state = self.deduplicator.claim(message)
+                    if state == CLAIMED:
+                        claimed.append(message)
+                    elif state == PROCESSING:
+                        busy += 1
+                    else:
+                        duplicates += 1
+                if duplicates:
+                    self.metrics.duplicates_total.inc(duplicates)
+                    logger.info(f"Skipped {duplicates} duplicate message(s)")
+                if busy:
+                    logger.warning(f"{busy} message(s) are still being sent by another worker, the batch will be redelivered")
+                messages = claimed
+            if not messages:
+                return not busy
+
+            for message in messages:
+                if 's3Url' in message:
+                    message['httpUrl'] = self._convert_s3_to_http_url(message['s3Url'])
 
+            futures = {}
+            # 순서 보장 전송 {future: OrderedSend}. 메시지를 하나씩 차례로 보내므로 타임아웃을 배치 길이만큼 늘립니다.
+            ordered = {}
             for channel_name, handler in self.handlers.items():
+                executor = self.executors[channel_name]
+                send_batch = getattr(handler, 'send_notifications', None)
+                if not send_batch and self.preserve_partition_order:
+                    send_batch = OrderedSend(handler)
+                    future = executor.submit(self._timed_send, channel_name, send_batch, messages, messages)
+                    futures[future] = (channel_name, messages)
+                    ordered[future] = send_batch
+                elif send_batch:
+                    future = executor.submit(self._timed_send, channel_name, send_batch, messages, messages)
+                    futures[future] = (channel_name, messages)
+                else:
+                    for message in messages:
+                        future = executor.submit(self._timed_send, channel_name, handler.send_notification, message, (message,))
+                        futures[future] = (channel_name, [message])
+            done, not_done = wait(futures, timeout=self.channel_send_timeout)
+            if ordered and len(messages) > 1 and not_done & ordered.keys():
+                more_done, _ = wait(not_done & ordered.keys(), timeout=self.channel_send_timeout * (len(messages) - 1))
+                done |= more_done
+                not_done -= more_done
+
+            failed_channels = set()
+            failed = []
+            # 순서 보장 채널에서 전달되지 않은 알림. 재시도 큐(지수 백오프)로 보내면 순서가 깨지므로
+            # 배치를 미완료로 돌려 같은 오프셋부터 다시 받고, 중복 제거로 이미 전달된 앞부분은 건너뜁니다.
+            held = []
+            # 타임아웃 후에도 순서 보장 채널에서 전송 중인 알림. 결과가 나온 뒤 중복 제거 기록을 확정하거나 해제합니다.
+            in_flight = []
+            for future in not_done:
+                channel_name, sent_messages = futures[future]
+                failed_channels.add(channel_name)
+                self.metrics.send_errors_total.labels(channel_name, 'timeout').inc()
+                timeout = self.channel_send_timeout * (len(sent_messages) if future in ordered else 1)
+                error = f"timed out after {timeout}s"
+                logger.error(f"Timed out sending {len(sent_messages)} message(s) to {channel_name} after {timeout}s")
+                if future in ordered:
+                    sender = ordered[future]
+                    sender.cancel()
+                    if future.cancel():
+                        held.extend(sent_messages)
+                        continue
+                    # 지금 보내는 메시지 하나는 늦게 성공할 수 있으므로 결과가 나올 때까지 선점을 유지합니다.
+                    current = sender.sent
+                    held.extend(sent_messages[current + 1:])
+                    if current < len(sent_messages):
+                        in_flight.append((future, sender, current, sent_messages[current]))
+                elif not future.cancel() and self.retry_scheduler:
+                    # 이미 시작된 전송은 중단할 수 없으므로, 끝난 뒤 실패했을 때만 재시도 큐에 넣습니다.
+                    # (바로 재시도하면 늦게 성공한 전송과 같은 알림이 두 번 갑니다)
+                    self._track_late_send(future, channel_name, sent_messages)
+                else:
+                    # 아직 시작하지 않아 취소된 전송은 그대로 실패로 처리합니다.
+                    # 재시도 큐가 없으면 배치를 다시 받으므로, 실행 중이던 전송이 늦게 성공하면 중복이 될 수 있습니다.
+                    failed.extend((channel_name, message, error) for message in sent_messages)
+            for future in done:
+                channel_name, sent_messages = futures[future]
                 try:
-                    handler.send_notification(message)
-                    logger.info(f"Message sent to {channel_name} successfully")
+                    future.result()
+                    logger.debug(f"{len(sent_messages)} message(s) sent to {channel_name} successfully")
                 except Exception as e:
-                    logger.error(f"Failed to send message to {channel_name}: {e}")
+                    failed_channels.add(channel_name)
+                    if future in ordered:
+                        # 앞에서부터 전달된 메시지는 그대로 두고, 실패한 메시지와 그 뒤의 메시지만 다시 보냅니다.
+                        unsent_messages = sent_messages[ordered[future].sent:]
+                        held.extend(unsent_messages)
+                        logger.error(f"Failed to send {len(unsent_messages)} of {len(sent_messages)} ordered message(s) to {channel_name}: {e}")
+                        continue
+                    failed.extend((channel_name, message, str(e)) for message in sent_messages)
+                    logger.error(f"Failed to send {len(sent_messages)} message(s) to {channel_name}: {e}")
+
+            if failed and self.retry_scheduler:
+                # 실패한 (채널, 알림)만 재시도 큐에 넣고 바로 다음 배치로 넘어갑니다.
+                # 재시도 큐가 전달을 책임지므로 배치는 처리 완료로 보고, 중복 제거 기록도 확정합니다.
+                # (타임아웃된 전송이 뒤늦게 성공하면 같은 알림이 한 번 더 갈 수 있습니다)
+                for channel_name, message, error in failed:
+                    self.retry_scheduler.schedule(channel_name, message, error)
+                failed = []
+            all_sent = not failed and not held and not in_flight
+            if self.deduplicator:
+                # 전달된 알림만 처리 완료로 기록하고, 실패한 알림은 재전달 시 다시 처리되도록 선점을 해제합니다.
+                unsent = {id(message) for _, message, _ in failed}
+                unsent.update(id(message) for message in held)
+                pending = set()
+                for future, sender, index, message in in_flight:
+                    pending.add(id(message))
+                    future.add_done_callback(functools.partial(self._settle_in_flight, sender, index, message, id(message) in unsent))
+                for message in messages:
+                    if id(message) in pending:
+                        continue
+                    if id(message) in unsent:
+                        self.deduplicator.release(message)
+                    else:
+                        self.deduplicator.confirm(message)
 
-            self._log_message(message)
+            for message in messages:
+                if failed_channels or self.log_sampler.should_log():
+                    self._log_message(message, failed_channels)
+            return all_sent and not busy
         except Exception as e:
-            logger.error(f"Error processing message: {e}")
-
-    def _log_message(self, message: Dict[str, Any]) -> None:
-        logger.info("=" * 50)
-        logger.info(f"File: {message.get('fileName', 'Unknown')}")
-        logger.info(f"Bucket: {message.get('bucketName', 'Unknown')}")
-        logger.info(f"Size: {message.get('fileSize', 'Unknown')}")
-        logger.info(f"Upload Time: {message.get('uploadTime', 'Unknown')}")
-        logger.info(f"S3 URL: {message.get('s3Url', 'Unknown')}")
-        logger.info(f"HTTP URL: {message.get('httpUrl', 'Unknown')}")
-        logger.info("=" * 50)
+            logger.error(f"Error processing message batch: {e}")
+            for message in claimed:
+                self.deduplicator.release(message)
+            return False
+
+    def _settle_in_flight(self, sender: OrderedSend, index: int, message: Dict[str, Any], failed_elsewhere: bool, future) -> None:
+        """타임아웃된 순서 보장 전송이 끝나면, 그때 보내던 알림의 중복 제거 기록을 확정하거나 해제합니다."""
+        if sender.sent > index and not failed_elsewhere:
+            self.deduplicator.confirm(message)
+        else:
+            self.deduplicator.release(message)
+
+    def _track_late_send(self, future, channel_name: str, messages: List[Dict[str, Any]]) -> None:
+        """타임아웃 후에도 실행 중인 전송을 추적하고, 결국 실패하면 재시도 큐에 넣습니다."""
+        with self._late_sends_lock:
+            self._late_sends[future] = (channel_name, messages)
+            pending = len(self._late_sends)
+        logger.warning(f"{pending} timed-out send(s) still running, waiting for their result before retrying")
+
+        def on_done(done_future) -> None:
+            with self._late_sends_lock:
+                if self._late_sends.pop(done_future, None) is None:
+                    return
+            error = done_future.exception()
+            if error is None:
+                logger.info(f"Timed-out send of {len(messages)} message(s) to {channel_name} completed late")
+                return
+            for message in messages:
+                self.retry_scheduler.schedule(channel_name, message, str(error))
+
+        future.add_done_callback(on_done)
+
+    def _drain_late_sends(self) -> None:
+        """
+        종료 전에 실행 중인 늦은 전송을 channel_send_timeout까지 기다립니다.
+        그래도 끝나지 않은 전송은 알림을 잃지 않도록 재시도 큐에 넣습니다. (늦게 성공하면 중복이 될 수 있습니다)
+        """
+        with self._late_sends_lock:
+            pending = list(self._late_sends)
+        if not pending:
+            return
+        _, not_done = wait(pending, timeout=self.channel_send_timeout)
+        for future in not_done:
+            with self._late_sends_lock:
+                entry = self._late_sends.pop(future, None)
+            if entry is None:
+                continue
+            channel_name, messages = entry
+            for message in messages:
+                self.retry_scheduler.schedule(channel_name, message, 'still running on shutdown')
+
+    def _timed_send(self, channel_name: str, send, payload, messages) -> None:
+        """채널 워커 스레드에서 send(payload)를 실행하고 전송 시간/결과를 지표로 남깁니다."""
+        started = time.monotonic()
+        try:
+            send(payload)
+        except Exception:
+            self.metrics.observe_send_error(channel_name, time.monotonic() - started)
+            raise
+        self.metrics.observe_send(channel_name, time.monotonic() - started, messages)
+
+    def _log_message(self, message: Dict[str, Any], failed_channels=()) -> None:
+        """메시지 하나의 처리 결과를 한 줄로 남깁니다. (LOG_FORMAT=json 이면 필드별 JSON 키)"""
+        level = logging.WARNING if failed_channels else logging.INFO
+        logger.log(level, "Notification processed", extra={'fields': {
+            'worker': self.worker_id,
+            'file': message.get('fileName', 'Unknown'),
+            'bucket': message.get('bucketName', 'Unknown'),
+            'size': message.get('fileSize', 'Unknown'),
+            'upload_time': message.get('uploadTime', 'Unknown'),
+            's3_url': message.get('s3Url', 'Unknown'),
+            'http_url': message.get('httpUrl', 'Unknown'),
+            'channels': ','.join(self.handlers),
+            'failed_channels': ','.join(sorted(failed_channels)),
+        }})
+
+    def on_partitions_revoked(self, revoked) -> None:
+        logger.info(f"[worker {self.worker_id}] Partitions revoked: {sorted(tp.partition for tp in revoked)}")
+        self.metrics.clear_lag(revoked)
+        for tp in revoked:
+            self._paused_until.pop(tp, None)
+        if self.commit_mode == 'manual' and (self._has_uncommitted or self._commit_in_flight):
+            try:
+                self.consumer.commit()
+                self._has_uncommitted = False
+            except Exception as e:
+                logger.error(f"Failed to commit offsets before rebalance: {e}")
+
+    def on_partitions_assigned(self, assigned) -> None:
+        logger.info(f"[worker {self.worker_id}] Partitions assigned: {sorted(tp.partition for tp in assigned)}")
+
+    def _partition_lag(self) -> Dict[TopicPartition, int]:
+        """할당된 파티션별 lag(highwater - 현재 위치)를 반환합니다."""
+        lag = {}
+        for tp in self.consumer.assignment():
+            highwater = self.consumer.highwater(tp)
+            if highwater is None:
+                continue
+            try:
+                lag[tp] = highwater - self.consumer.position(tp)
+            except Exception:
+                continue
+        return lag
+
+    def _maybe_commit(self, force: bool = False) -> None:
+        """
+        처리 완료된 오프셋을 비동기로 커밋합니다.
+        이전 커밋이 진행 중이거나 commit_interval이 지나지 않았으면 다음 배치로 미뤄 여러 배치를 한 번에 커밋합니다.
+        """
+        if not self._has_uncommitted or self._commit_in_flight:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_commit_time < self.commit_interval:
+            return
+
+        self._has_uncommitted = False
+        self._commit_in_flight = True
+        self._last_commit_time = now
+        # offsets를 지정하지 않으면 poll()로 반환된(= 이미 처리가 끝난) 레코드까지의 위치가 커밋됩니다.
+        self.consumer.commit_async(callback=self._on_commit_complete)
+
+    def _on_commit_complete(self, offsets, response) -> None:
+        self._commit_in_flight = False
+        if isinstance(response, Exception):
+            logger.error(f"Failed to commit offsets {offsets}: {response}")
+            # 다음 배치 처리 후 다시 커밋을 시도합니다.
+            self._has_uncommitted = True
+
+    def _decode_records(self, records) -> List[Dict[str, Any]]:
+        messages = []
+        for record in records:
+            try:
+                messages.append(decode_record(record.value, record.headers))
+            except Exception as e:
+                self.metrics.decode_errors_total.inc()
+                logger.error(f"Failed to decode message at {record.topic}-{record.partition}@{record.offset}: {e}")
+        return messages
+
+    def _redeliver_later(self, tp: TopicPartition, records) -> None:
+        """
+        전송에 실패한 배치의 시작 오프셋으로 되돌리고, batch_retry_backoff 동안 파티션을 멈춥니다.
+        되돌린 위치보다 앞의 오프셋만 커밋되므로 실패한 배치는 다시 전달됩니다.
+        """
+        self.consumer.seek(tp, records[0].offset)
+        self.consumer.pause(tp)
+        self._paused_until[tp] = time.monotonic() + self.batch_retry_backoff
+        logger.warning(f"Batch {tp.topic}-{tp.partition}@{records[0].offset} was not delivered, "
+                       f"retrying in {self.batch_retry_backoff}s")
+
+    def _resume_paused(self) -> None:
+        now = time.monotonic()
+        for tp, resume_at in list(self._paused_until.items()):
+            if resume_at <= now:
+                del self._paused_until[tp]
+                if tp in self.consumer.assignment():
+                    self.consumer.resume(tp)
+
+    def _consume_batches(self) -> None:
+        """
+        poll(max_records, timeout_ms)로 레코드를 가져와 파티션별 배치 단위로 처리합니다.
+        throughput_log_interval마다 처리량과 평균 배치 크기를 로그로 남깁니다.
+        """
+        window_start = time.monotonic()
+        window_records = 0
+        window_batches = 0
+        while True:
+            self._resume_paused()
+            batches = self.consumer.poll(timeout_ms=self.poll_timeout_ms, max_records=self.max_poll_records)
+            # poll()이 반환한 시점에 위치가 배치 끝으로 이동하므로, 처리하지 못한 배치는 위치를 되돌려야 커밋되지 않습니다.
+            pending = dict(batches)
+            try:
+                for tp, records in batches.items():
+                    self.metrics.observe_records(len(records))
+                    self.metrics.batch_size.observe(len(records))
+                    if self.process_batch(self._decode_records(records)):
+                        if self.commit_mode == 'manual':
+                            # 배치의 모든 레코드가 채널에 전달(또는 재시도 큐에 등록)된 뒤에만 커밋 대상이 됩니다.
+                            self._has_uncommitted = True
+                    else:
+                        self._redeliver_later(tp, records)
+                    del pending[tp]
+                    window_records += len(records)
+                    window_batches += 1
+            finally:
+                # 처리 도중 종료되면 남은 배치의 위치를 되돌려 종료 시 커밋에 포함되지 않도록 합니다.
+                for tp, records in pending.items():
+                    self.consumer.seek(tp, records[0].offset)
+            if self.commit_mode == 'manual':
+                self._maybe_commit()
+
+            elapsed = time.monotonic() - window_start
+            if elapsed >= self.throughput_log_interval:
+                avg_batch_size = window_records / window_batches if window_batches else 0
+                lag = self._partition_lag()
+                self.metrics.set_lag(lag)
+                lag_by_partition = {f'{tp.topic}-{tp.partition}': value for tp, value in lag.items()}
+                logger.info(
+                    f"[worker {self.worker_id}] Throughput: {window_records / elapsed:.1f} records/sec, "
+                    f"{window_batches} batches, avg batch size {avg_batch_size:.1f} "
+                    f"(max_poll_records={self.max_poll_records}), "
+                    f"lag {sum(lag.values())} {lag_by_partition}"
+                )
+                window_start = time.monotonic()
+                window_records = 0
+                window_batches = 0
 
     def start_consuming(self):
-        logger.info("Starting Kafka message consumption...")
+        logger.info(f"Starting Kafka message consumption (commit mode: {self.commit_mode})...")
+        if self.retry_scheduler:
+            self.retry_scheduler.start()
         try:
-            for message in self.consumer:
-                try:
-                    self.process_message(message.value)
-                except Exception as e:
-                    logger.error(f"Error processing individual message: {e}")
+            self._consume_batches()
         except KeyboardInterrupt:
             logger.info("Shutting down...")
         except Exception as e:
             logger.error(f"Error in main consumption loop: {e}")
         finally:
+            if self.commit_mode == 'manual' and (self._has_uncommitted or self._commit_in_flight):
+                try:
+                    # 종료 전에 처리가 끝난 오프셋을 동기로 커밋합니다.
+                    self.consumer.commit()
+                except Exception as e:
+                    logger.error(f"Failed to commit offsets on shutdown: {e}")
             self.consumer.close()
+            # 다이제스트 버퍼 등 핸들러가 들고 있는 자원을 정리합니다.
+            # (버퍼 전송에 실패한 메시지가 재시도 큐에 들어가도록 재시도 큐보다 먼저 닫습니다)
+            for handler in self.handlers.values():
+                if hasattr(handler, 'close'):
+                    handler.close()
+            if self.retry_scheduler:
+                # 채널 워커 풀을 닫기 전에 스케줄러 스레드를 먼저 멈춰 종료 중에 재시도를 넘기지 않도록 합니다.
+                self.retry_scheduler.stop_dispatching()
+                self._drain_late_sends()
+            # 아직 시작하지 않은 전송은 취소합니다. (재시도였다면 큐에 in_flight로 남아 다음 실행에서 다시 시도됩니다)
+            for executor in self.executors.values():
+                executor.shutdown(wait=False, cancel_futures=True)
+            if self.retry_scheduler:
+                # 실행 중인 재시도가 끝나기를 기다린 뒤 큐를 닫습니다. 남은 재시도는 큐 파일에 그대로 두고 다음 실행에서 이어서 처리합니다.
+                self.retry_scheduler.stop()
             logger.info("Kafka consumer closed")
 
+def metrics_enabled() -> bool:
+    return os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+
+
+def _raise_keyboard_interrupt(signum, frame):
+    # SIGTERM(파드 종료, 워커 종료)도 Ctrl+C와 같이 처리하여 오프셋 커밋 등 정리 작업을 수행합니다.
+    raise KeyboardInterrupt
+
+
+def _run_worker(worker_id: int) -> None:
+    if multiprocessing.parent_process() is not None:
+        # fork된 워커 프로세스에는 부모의 로그 출력 스레드가 없으므로 다시 설정합니다.
+        configure_logging()
+    signal.signal(signal.SIGTERM, _raise_keyboard_interrupt)
+    service = KafkaToChannelsService(worker_id=worker_id)
+    service.start_consuming()
+
+
+def run_worker_pool(num_workers: int) -> None:
+    """
+    같은 컨슈머 그룹에 속한 워커 프로세스 num_workers개를 띄웁니다.
+    파티션은 Kafka 그룹 코디네이터가 워커(및 다른 파드)에 나눠 주므로, 토픽 파티션 수보다 많은 워커는 대기 상태가 됩니다.
+    비정상 종료된 워커는 다시 시작합니다.
+    """
+    workers: Dict[int, multiprocessing.Process] = {}
+    stopping = False
+
+    def start_worker(worker_id: int) -> None:
+        process = multiprocessing.Process(target=_run_worker, args=(worker_id,), name=f'consumer-worker-{worker_id}')
+        process.start()
+        workers[worker_id] = process
+        logger.info(f"Started consumer worker {worker_id} (pid={process.pid})")
+
+    def stop_workers(signum=None, frame=None) -> None:
+        nonlocal stopping
+        stopping = True
+        for process in workers.values():
+            if process.is_alive():
+                process.terminate()
+
+    signal.signal(signal.SIGTERM, stop_workers)
+    for worker_id in range(num_workers):
+        start_worker(worker_id)
+
+    try:
+        while not stopping:
+            for worker_id, process in list(workers.items()):
+                if not process.is_alive() and not stopping:
+                    logger.warning(f"Consumer worker {worker_id} exited with code {process.exitcode}, restarting")
+                    mark_worker_dead(process.pid)
+                    start_worker(worker_id)
+            time.sleep(5)
+    except KeyboardInterrupt:
+        stop_workers()
+    finally:
+        for process in workers.values():
+            process.join()
+        logger.info("All consumer workers stopped")
+
+
 def main():
     if not os.getenv('MSK_BOOTSTRAP_SERVERS'):
         logger.error("MSK_BOOTSTRAP_SERVERS environment variable is not set")
         sys.exit(1)
 
-    service = KafkaToChannelsService()
-    service.start_consuming()
+    # CONSUMER_WORKERS > 1 이면 파티션을 나눠 가지는 워커 프로세스 풀로 실행합니다.
+    num_workers = int(os.getenv('CONSUMER_WORKERS', 1))
+
+    # /metrics 엔드포인트 (Prometheus가 METRICS_PORT를 스크레이프합니다)
+    if metrics_enabled():
+        if num_workers > 1 and not os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+            # 워커 프로세스들이 지표를 파일로 남기고, 부모 프로세스가 합쳐서 노출합니다.
+            # prometheus_client가 import 되기 전에 설정해야 합니다.
+            os.environ['PROMETHEUS_MULTIPROC_DIR'] = tempfile.mkdtemp(prefix='prometheus-')
+        start_metrics_server(int(os.getenv('METRICS_PORT', 9102)))
+
+    if num_workers > 1:
+        run_worker_pool(num_workers)
+    else:
+        _run_worker(0)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,187 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'fanda:notified'
+
+# claim() 결과 / 백엔드에 저장하는 값
+CLAIMED = 'claimed'         # 이번 호출이 선점함 (전송 후 confirm 또는 release)
+PROCESSING = 'processing'   # 다른 워커(또는 죽은 워커)가 전송 중 (processing_ttl_seconds 후 만료)
+DONE = 'done'               # 이미 전송 완료
+
+
+class DictDedupBackend:
+    """
+    프로세스 내부 dict 기반 백엔드입니다. Redis 없이 로컬에서 실행하거나 테스트할 때 사용합니다.
+    파드(프로세스)마다 따로 가지므로 다른 파드로 재전달된 중복은 거르지 못합니다.
+    키는 최대 max_entries개까지만 보관하며, 만료된 키와 가장 오래된 키부터 지웁니다.
+    """
+
+    def __init__(self, max_entries: int = 50000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def set_if_absent(self, key: str, value: str, ttl_seconds: int) -> Optional[str]:
+        """키가 없으면 저장하고 None을, 있으면 저장된 값을 반환합니다."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > now:
+                return entry[0]
+            self._store(key, value, now + ttl_seconds, now)
+            return None
+
+    def set(self, key: str, value: str, ttl_seconds: int) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._store(key, value, now + ttl_seconds, now)
+
+    def _store(self, key: str, value: str, expires_at: float, now: float) -> None:
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        # 앞쪽(가장 오래 갱신되지 않은 키)부터 만료된 키를 지우고, 그래도 넘치면 가장 오래된 키를 지웁니다.
+        while self._entries:
+            oldest_key, (_, oldest_expires_at) = next(iter(self._entries.items()))
+            if oldest_expires_at > now and len(self._entries) <= self.max_entries:
+                break
+            del self._entries[oldest_key]
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class RedisDedupBackend:
+    """
+    Redis(ElastiCache) 기반 백엔드입니다. SET NX EX로 키를 원자적으로 선점하며, 모든 파드가 같은 기록을 봅니다.
+    """
+
+    def __init__(self, client):
+        self.client = client
+
+    def set_if_absent(self, key: str, value: str, ttl_seconds: int) -> Optional[str]:
+        if self.client.set(key, value, nx=True, ex=ttl_seconds):
+            return None
+        existing = self.client.get(key)
+        if existing is None:
+            # 확인하는 사이에 만료된 경우, 선점하지 않은 채로 처리 중으로 보고 다음에 다시 시도합니다.
+            return PROCESSING
+        return existing.decode('utf-8') if isinstance(existing, bytes) else str(existing)
+
+    def set(self, key: str, value: str, ttl_seconds: int) -> None:
+        self.client.set(key, value, ex=ttl_seconds)
+
+    def delete(self, key: str) -> None:
+        self.client.delete(key)
+
+
+class NotificationDeduplicator:
+    """
+    bucket, key, 업로드 시각으로 알림을 식별하여 이미 처리한 알림을 걸러냅니다.
+
+    백엔드(Redis) 앞에 프로세스 내부 LRU 캐시를 두어, 같은 파드로 다시 전달된 중복은 네트워크 호출 없이 걸러냅니다.
+    백엔드에 접근할 수 없으면 알림을 놓치지 않도록 중복이 아닌 것으로 간주합니다.
+    """
+
+    def __init__(self, backend, ttl_seconds: int = 86400, local_cache_size: int = 10000,
+                 processing_ttl_seconds: int = 300):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.processing_ttl_seconds = processing_ttl_seconds
+        self.local_cache_size = local_cache_size
+        self._local: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def make_key(self, message: Dict[str, Any]) -> str:
+        bucket = message.get('bucketName', '')
+        s3_url = message.get('s3Url', '')
+        object_key = s3_url.split('/', 3)[3] if s3_url.count('/') >= 3 else message.get('fileName', '')
+        return f"{KEY_PREFIX}:{bucket}:{object_key}:{message.get('uploadTime', '')}"
+
+    def claim(self, message: Dict[str, Any]) -> str:
+        """
+        처음 보는 알림이면 선점하고 CLAIMED를, 전송이 끝난 알림이면 DONE을,
+        다른 워커가 아직 전송 중인 알림이면 PROCESSING을 반환합니다.
+        선점은 processing_ttl_seconds 동안만 유지됩니다. PROCESSING인 알림은 건너뛰지 말고 나중에 다시 처리해야
+        전송 도중 워커가 죽은 경우에도 알림을 잃지 않습니다.
+        """
+        key = self.make_key(message)
+        if self._seen_locally(key):
+            return DONE
+        try:
+            existing = self.backend.set_if_absent(key, PROCESSING, self.processing_ttl_seconds)
+        except Exception as e:
+            logger.warning(f"Dedup backend unavailable, treating message as new: {e}")
+            return CLAIMED
+        if existing is None:
+            return CLAIMED
+        if existing == PROCESSING:
+            return PROCESSING
+        # DONE (이전 버전이 저장한 값 포함)
+        self._remember_locally(key)
+        return DONE
+
+    def confirm(self, message: Dict[str, Any]) -> None:
+        """
+        전송을 마친(또는 재시도 큐에 넘긴) 알림의 선점을 ttl_seconds 동안 유지되는 처리 완료 기록으로 바꿉니다.
+        """
+        key = self.make_key(message)
+        self._remember_locally(key)
+        try:
+            self.backend.set(key, DONE, self.ttl_seconds)
+        except Exception as e:
+            logger.warning(f"Failed to confirm dedup key {key}: {e}")
+
+    def release(self, message: Dict[str, Any]) -> None:
+        """
+        전송에 실패한 알림의 선점을 해제하여 재전달 시 다시 처리되도록 합니다.
+        """
+        key = self.make_key(message)
+        with self._lock:
+            self._local.pop(key, None)
+        try:
+            self.backend.delete(key)
+        except Exception as e:
+            logger.warning(f"Failed to release dedup key {key}: {e}")
+
+    def _seen_locally(self, key: str) -> bool:
+        with self._lock:
+            expires_at = self._local.get(key)
+            if expires_at is None:
+                return False
+            if expires_at <= time.monotonic():
+                del self._local[key]
+                return False
+            self._local.move_to_end(key)
+            return True
+
+    def _remember_locally(self, key: str) -> None:
+        with self._lock:
+            self._local[key] = time.monotonic() + self.ttl_seconds
+            self._local.move_to_end(key)
+            while len(self._local) > self.local_cache_size:
+                self._local.popitem(last=False)
+
+
+def create_deduplicator(redis_url: Optional[str], ttl_seconds: int, local_cache_size: int,
+                        processing_ttl_seconds: int = 300, max_entries: int = 50000) -> NotificationDeduplicator:
+    """
+    REDIS_URL이 있으면 Redis 백엔드를, 없거나 redis 패키지가 없으면 dict 백엔드(최대 max_entries개)를 사용합니다.
+    """
+    backend = DictDedupBackend(max_entries=max_entries)
+    if redis_url:
+        try:
+            import redis
+            backend = RedisDedupBackend(redis.Redis.from_url(redis_url, socket_timeout=1))
+            logger.info("Notification dedup store: redis")
+        except ImportError:
+            logger.warning("redis package is not installed. Falling back to in-process dedup store.")
+    else:
+        logger.info("Notification dedup store: in-process (REDIS_URL not set)")
+    return NotificationDeduplicator(backend, ttl_seconds=ttl_seconds, local_cache_size=local_cache_size,
+                                    processing_ttl_seconds=processing_ttl_seconds)
@@ -0,0 +1,90 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    한 레코드를 JSON 한 줄로 출력합니다.
+    logger.info(..., extra={'fields': {...}})로 넘긴 값은 최상위 키로 함께 기록됩니다.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            'ts': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'process': record.process,
+            'thread': record.threadName,
+            'msg': record.getMessage(),
+        }
+        fields = getattr(record, 'fields', None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """기존 텍스트 포맷 뒤에 extra={'fields': {...}} 값을 key=value 형태로 붙입니다."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = getattr(record, 'fields', None)
+        if fields:
+            line += ' ' + ' '.join(f'{key}={value}' for key, value in fields.items())
+        return line
+
+
+def configure_logging() -> Optional[QueueListener]:
+    """
+    루트 로거를 설정합니다.
+
+    LOG_FORMAT  : text(기본값) | json (한 줄에 JSON 하나)
+    LOG_ASYNC   : true(기본값)이면 QueueHandler로 레코드를 큐에 넣고, 별도 스레드의 QueueListener가 stdout에 씁니다.
+                  처리 스레드는 stdout 쓰기를 기다리지 않습니다.
+    LOG_LEVEL   : 기본값 INFO
+    워커 풀 모드에서는 프로세스마다 (fork 이후) 다시 호출해야 리스너 스레드가 살아 있습니다.
+    """
+    formatter = JsonFormatter() if os.getenv('LOG_FORMAT', 'text').lower() == 'json' else TextFormatter(TEXT_FORMAT)
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(formatter)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.setLevel(os.getenv('LOG_LEVEL', 'INFO').upper())
+
+    if os.getenv('LOG_ASYNC', 'true').lower() != 'true':
+        root.addHandler(stream_handler)
+        return None
+
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    root.addHandler(QueueHandler(log_queue))
+    listener.start()
+    # 종료 시 큐에 남은 로그를 모두 출력합니다.
+    atexit.register(listener.stop)
+    return listener
+
+
+class LogSampler:
+    """
+    메시지 단위 로그를 rate 비율(0~1)만큼만 남깁니다. 실패한 메시지는 항상 남기도록 호출하는 쪽에서 판단합니다.
+    """
+
+    def __init__(self, rate: float):
+        self.rate = min(max(rate, 0.0), 1.0)
+
+    def should_log(self) -> bool:
+        return self.rate >= 1.0 or random.random() < self.rate
@@ -0,0 +1,190 @@
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+METRIC_PREFIX = 'fanda'
+
+# S3 업로드부터 채널 핸들러가 전송(배치/다이제스트 모드에서는 버퍼에 추가)을 마칠 때까지 걸린 시간 (초)
+END_TO_END_BUCKETS = (0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+# 채널 API 호출 한 번(또는 배치 한 번)에 걸린 시간 (초)
+SEND_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+# poll()로 가져온 파티션 배치 하나의 레코드 수
+BATCH_SIZE_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+def _parse_upload_time(upload_time: Optional[str]) -> Optional[float]:
+    """S3 이벤트의 eventTime(예: 2025-08-21T09:15:30.123Z)을 epoch 초로 변환합니다."""
+    if not upload_time:
+        return None
+    try:
+        return datetime.fromisoformat(upload_time.replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return None
+
+
+class _NoopMetric:
+    def labels(self, *args, **kwargs) -> '_NoopMetric':
+        return self
+
+    def inc(self, amount: float = 1) -> None:
+        pass
+
+    def observe(self, amount: float) -> None:
+        pass
+
+    def set(self, value: float) -> None:
+        pass
+
+    def remove(self, *labels) -> None:
+        pass
+
+
+class ConsumerMetrics:
+    """
+    KafkaToChannelsService가 기록하는 Prometheus 지표 모음입니다.
+
+    prometheus_client가 설치되어 있지 않거나 비활성화되어 있으면 모든 지표가 아무 일도 하지 않으므로,
+    호출하는 쪽에서 활성화 여부를 확인할 필요가 없습니다.
+    """
+
+    def __init__(self, enabled: bool = True, worker: int = 0):
+        self.enabled = False
+        # 워커 풀 모드에서 워커별로 구분할 값 (재시작해도 같은 워커 번호를 사용합니다)
+        self.worker = str(worker)
+        noop = _NoopMetric()
+        self.end_to_end_seconds = self.send_seconds = self.sent_total = self.send_errors_total = noop
+        self.records_total = self.decode_errors_total = self.duplicates_total = noop
+        self.batch_size = self.lag = noop
+        self.retries_total = self.dead_letters_total = noop
+        if not enabled:
+            return
+        try:
+            from prometheus_client import Counter, Gauge, Histogram
+        except ImportError:
+            logger.warning("prometheus_client is not installed. Metrics are disabled.")
+            return
+
+        self.enabled = True
+        self.end_to_end_seconds = Histogram(
+            f'{METRIC_PREFIX}_notification_end_to_end_seconds',
+            'Time from S3 upload (uploadTime) to successful delivery on a channel',
+            ['channel'], buckets=END_TO_END_BUCKETS
+        )
+        self.send_seconds = Histogram(
+            f'{METRIC_PREFIX}_channel_send_seconds',
+            'Duration of a single channel send call (one message, or one batch for batch-capable handlers)',
+            ['channel'], buckets=SEND_BUCKETS
+        )
+        self.sent_total = Counter(
+            f'{METRIC_PREFIX}_channel_messages_sent_total',
+            'Notifications delivered to a channel', ['channel']
+        )
+        self.send_errors_total = Counter(
+            f'{METRIC_PREFIX}_channel_send_errors_total',
+            'Failed channel sends by reason (error, timeout, flush)', ['channel', 'reason']
+        )
+        self.retries_total = Counter(
+            f'{METRIC_PREFIX}_channel_retries_total',
+            'Retry attempts dispatched from the retry queue', ['channel']
+        )
+        self.dead_letters_total = Counter(
+            f'{METRIC_PREFIX}_channel_dead_letters_total',
+            'Notifications sent to the dead-letter sink after exhausting retries', ['channel']
+        )
+        self.records_total = Counter(
+            f'{METRIC_PREFIX}_consumer_records_total',
+            'Records fetched from Kafka', ['worker']
+        )
+        self.decode_errors_total = Counter(
+            f'{METRIC_PREFIX}_consumer_decode_errors_total',
+            'Records that could not be decoded'
+        )
+        self.duplicates_total = Counter(
+            f'{METRIC_PREFIX}_consumer_duplicates_total',
+            'Notifications skipped by the deduplicator'
+        )
+        self.batch_size = Histogram(
+            f'{METRIC_PREFIX}_consumer_batch_size',
+            'Records per partition batch returned by poll()',
+            buckets=BATCH_SIZE_BUCKETS
+        )
+        # 살아 있는 워커의 값만 보여 줍니다. worker 라벨로 어느 워커가 파티션을 처리 중인지 구분합니다.
+        self.lag = Gauge(
+            f'{METRIC_PREFIX}_consumer_lag',
+            'Records between the partition high watermark and the consumer position',
+            ['topic', 'partition', 'worker'], multiprocess_mode='livesum'
+        )
+
+    def observe_send(self, channel: str, seconds: float, messages) -> None:
+        """채널 전송 성공 시 호출합니다. messages는 이번 호출로 전달된 알림 목록입니다."""
+        self.send_seconds.labels(channel).observe(seconds)
+        if not self.enabled:
+            return
+        self.sent_total.labels(channel).inc(len(messages))
+        now = time.time()
+        end_to_end = self.end_to_end_seconds.labels(channel)
+        for message in messages:
+            uploaded_at = _parse_upload_time(message.get('uploadTime'))
+            if uploaded_at is not None:
+                end_to_end.observe(max(now - uploaded_at, 0))
+
+    def observe_records(self, count: int) -> None:
+        self.records_total.labels(self.worker).inc(count)
+
+    def observe_send_error(self, channel: str, seconds: float, reason: str = 'error') -> None:
+        self.send_seconds.labels(channel).observe(seconds)
+        self.send_errors_total.labels(channel, reason).inc()
+
+    def set_lag(self, lag: Dict) -> None:
+        """lag: {TopicPartition: lag}"""
+        for tp, value in lag.items():
+            self.lag.labels(tp.topic, str(tp.partition), self.worker).set(value)
+
+    def clear_lag(self, partitions) -> None:
+        """
+        리밸런스로 넘겨준 파티션의 lag 지표를 지웁니다. (다른 워커가 새로 보고합니다)
+        멀티 프로세스 모드에서는 remove()가 지표 파일의 값을 지우지 않으므로, 먼저 0으로 설정합니다.
+        """
+        for tp in partitions:
+            self.lag.labels(tp.topic, str(tp.partition), self.worker).set(0)
+            try:
+                self.lag.remove(tp.topic, str(tp.partition), self.worker)
+            except KeyError:
+                pass
+
+
+def start_metrics_server(port: int) -> bool:
+    """
+    /metrics HTTP 엔드포인트를 띄웁니다.
+    PROMETHEUS_MULTIPROC_DIR이 설정되어 있으면(워커 풀 모드) 모든 워커 프로세스의 지표를 합쳐서 노출합니다.
+    """
+    try:
+        from prometheus_client import CollectorRegistry, start_http_server
+        from prometheus_client import multiprocess
+    except ImportError:
+        logger.warning("prometheus_client is not installed. Metrics endpoint is disabled.")
+        return False
+
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        start_http_server(port, registry=registry)
+    else:
+        start_http_server(port)
+    logger.info(f"Metrics endpoint listening on :{port}/metrics")
+    return True
+
+
+def mark_worker_dead(pid: Optional[int]) -> None:
+    """종료된 워커 프로세스의 live 게이지 값을 정리합니다. (워커 풀 모드에서만 의미가 있습니다)"""
+    if pid is None or not os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        return
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    multiprocess.mark_process_dead(pid)
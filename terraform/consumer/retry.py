@@ -0,0 +1,264 @@
+import json
+import logging
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from notification_codec import encode_notification
+
+logger = logging.getLogger(__name__)
+
+
+class RetryPolicy:
+    """
+    지수 백오프 + full jitter 재시도 정책입니다.
+    attempt번째 재시도 전 대기 시간은 0 ~ min(max_delay, base_delay * 2^(attempt-1)) 사이의 임의 값입니다.
+    """
+
+    def __init__(self, max_attempts: int = 5, base_delay: float = 2, max_delay: float = 300):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def next_delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+
+class SqliteRetryStore:
+    """
+    재시도 대기 중인 (채널, 알림)을 SQLite 파일에 보관합니다.
+    워커 프로세스가 재시작되어도 같은 경로를 열면 남은 재시도를 이어서 처리합니다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS retries ('
+            ' id INTEGER PRIMARY KEY AUTOINCREMENT,'
+            ' channel TEXT NOT NULL,'
+            ' payload TEXT NOT NULL,'
+            ' attempt INTEGER NOT NULL,'
+            ' due_at REAL NOT NULL,'
+            ' in_flight INTEGER NOT NULL DEFAULT 0,'
+            ' last_error TEXT)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS retries_due_at ON retries (due_at)')
+        self._lock = threading.Lock()
+
+    def add(self, channel: str, message: Dict[str, Any], attempt: int, due_at: float, error: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                'INSERT INTO retries (channel, payload, attempt, due_at, last_error) VALUES (?, ?, ?, ?, ?)',
+                (channel, json.dumps(message, ensure_ascii=False), attempt, due_at, error)
+            )
+
+    def take_due(self, now: float, limit: int) -> List[Tuple[int, str, Dict[str, Any], int]]:
+        """
+        due_at이 지난 항목을 (id, channel, message, attempt)로 반환합니다.
+        반환한 항목은 처리 중(in_flight)으로 표시하여 중복으로 꺼내지 않습니다.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT id, channel, payload, attempt FROM retries WHERE in_flight = 0 AND due_at <= ? ORDER BY due_at LIMIT ?',
+                (now, limit)
+            ).fetchall()
+            if rows:
+                self._conn.executemany('UPDATE retries SET in_flight = 1 WHERE id = ?', [(row[0],) for row in rows])
+        return [(row_id, channel, json.loads(payload), attempt) for row_id, channel, payload, attempt in rows]
+
+    def reschedule(self, row_id: int, attempt: int, due_at: float, error: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                'UPDATE retries SET attempt = ?, due_at = ?, last_error = ?, in_flight = 0 WHERE id = ?',
+                (attempt, due_at, error, row_id)
+            )
+
+    def remove(self, row_id: int) -> None:
+        with self._lock:
+            self._conn.execute('DELETE FROM retries WHERE id = ?', (row_id,))
+
+    def recover_in_flight(self, now: float) -> int:
+        """이전 프로세스가 처리 도중 종료되어 남은 항목을 즉시 다시 시도하도록 되돌립니다."""
+        with self._lock:
+            return self._conn.execute('UPDATE retries SET due_at = ?, in_flight = 0 WHERE in_flight = 1', (now,)).rowcount
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM retries').fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class LogDeadLetterSink:
+    """재시도를 모두 소진한 알림을 ERROR 로그로 남깁니다. (DEAD_LETTER_TOPIC이 없을 때)"""
+
+    def send(self, channel: str, message: Dict[str, Any], attempts: int, error: str) -> None:
+        logger.error(f"Dead-lettered notification for {channel} after {attempts} attempts: {error}", extra={'fields': {
+            'channel': channel, 'attempts': attempts, 'notification': message,
+        }})
+
+    def close(self) -> None:
+        pass
+
+
+class KafkaDeadLetterSink:
+    """
+    재시도를 모두 소진한 알림을 dead-letter 토픽으로 보냅니다.
+    값은 원래 알림(JSON)이고, 채널/시도 횟수/마지막 오류는 레코드 헤더에 담습니다.
+    """
+
+    def __init__(self, producer, topic: str):
+        self.producer = producer
+        self.topic = topic
+
+    def send(self, channel: str, message: Dict[str, Any], attempts: int, error: str) -> None:
+        headers = [
+            ('fanda-channel', channel.encode('utf-8')),
+            ('fanda-attempts', str(attempts).encode('ascii')),
+            ('fanda-error', error.encode('utf-8')[:1024]),
+        ]
+        self.producer.send(self.topic, encode_notification(message), headers=headers).get(timeout=30)
+        logger.warning(f"Dead-lettered notification for {channel} to {self.topic} after {attempts} attempts: {error}")
+
+    def close(self) -> None:
+        self.producer.close()
+
+
+class RetryScheduler:
+    """
+    실패한 채널 전송을 백그라운드에서 재시도합니다.
+
+    메인 consume 루프는 schedule()로 실패 항목을 저장소에 넣기만 하고 바로 다음 배치로 넘어갑니다.
+    스케줄러 스레드는 due_at이 지난 항목을 꺼내 submit(channel, message)로 채널 워커 풀에 넘기고,
+    실패하면 백오프 후 다시 예약하거나, max_attempts를 넘기면 dead-letter sink로 보냅니다.
+    """
+
+    def __init__(self, store: SqliteRetryStore, policy: RetryPolicy, dead_letter,
+                 submit: Callable[[str, Dict[str, Any]], Any], metrics=None,
+                 poll_interval: float = 1.0, batch_size: int = 50, drain_timeout: float = 30):
+        self.store = store
+        self.policy = policy
+        self.dead_letter = dead_letter
+        self.submit = submit
+        self.metrics = metrics
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.drain_timeout = drain_timeout
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # 채널 워커 풀에 넘긴 재시도 중 아직 끝나지 않은 future
+        self._dispatched = set()
+        # 저장소를 닫은 뒤에는 완료 콜백이 저장소를 건드리지 않도록 합니다.
+        self._store_lock = threading.Lock()
+        self._closed = False
+
+    def start(self) -> None:
+        recovered = self.store.recover_in_flight(time.time())
+        pending = len(self.store)
+        if pending:
+            logger.info(f"Retry queue has {pending} pending notification(s) ({recovered} recovered from a previous run)")
+        self._thread = threading.Thread(target=self._run, name='retry-scheduler', daemon=True)
+        self._thread.start()
+
+    def stop_dispatching(self) -> None:
+        """스케줄러 스레드를 멈춰 채널 워커 풀에 새 재시도를 넘기지 않도록 합니다. (schedule()은 계속 받습니다)"""
+        self._stopped.set()
+        if self._thread:
+            self._thread.join(timeout=self.poll_interval * 2)
+            self._thread = None
+
+    def stop(self) -> None:
+        """
+        새 재시도를 꺼내지 않도록 멈추고, 이미 채널 워커 풀에 넘긴 재시도를 drain_timeout까지 기다린 뒤 저장소를 닫습니다.
+        그 뒤에 끝난 재시도는 처리 중(in_flight)으로 남아 다음 실행의 start()에서 다시 시도됩니다.
+        """
+        self.stop_dispatching()
+        with self._store_lock:
+            dispatched = list(self._dispatched)
+        if dispatched:
+            _, not_done = wait(dispatched, timeout=self.drain_timeout)
+            if not_done:
+                logger.warning(f"{len(not_done)} retry send(s) still running on shutdown, they will be retried on the next start")
+        with self._store_lock:
+            self._closed = True
+            self.dead_letter.close()
+            self.store.close()
+
+    def schedule(self, channel: str, message: Dict[str, Any], error: str) -> None:
+        """첫 전송에 실패한 알림을 재시도 대기열에 넣습니다. (첫 전송이 attempt 1)"""
+        with self._store_lock:
+            if self._closed:
+                logger.error(f"Retry queue is closed, dropping notification for {channel}: {error}", extra={'fields': {
+                    'channel': channel, 'notification': message,
+                }})
+                return
+            self._retry_or_dead_letter(None, channel, message, 1, error)
+
+    def _retry_or_dead_letter(self, row_id: Optional[int], channel: str, message: Dict[str, Any], attempt: int, error: str) -> None:
+        if attempt >= self.policy.max_attempts:
+            try:
+                self.dead_letter.send(channel, message, attempt, error)
+            except Exception as e:
+                # dead-letter에도 보내지 못하면 버리지 않고 최대 지연으로 다시 예약합니다.
+                logger.error(f"Failed to dead-letter notification for {channel}: {e}")
+                self._save(row_id, channel, message, attempt, time.time() + self.policy.max_delay, error)
+                return
+            if self.metrics:
+                self.metrics.dead_letters_total.labels(channel).inc()
+            if row_id is not None:
+                self.store.remove(row_id)
+            return
+
+        delay = self.policy.next_delay(attempt)
+        self._save(row_id, channel, message, attempt, time.time() + delay, error)
+        logger.info(f"Scheduled retry {attempt}/{self.policy.max_attempts - 1} for {channel} in {delay:.1f}s: {error}")
+
+    def _save(self, row_id: Optional[int], channel: str, message: Dict[str, Any], attempt: int, due_at: float, error: str) -> None:
+        if row_id is None:
+            self.store.add(channel, message, attempt, due_at, error)
+        else:
+            self.store.reschedule(row_id, attempt, due_at, error)
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.poll_interval):
+            try:
+                for row_id, channel, message, attempt in self.store.take_due(time.time(), self.batch_size):
+                    self._dispatch(row_id, channel, message, attempt)
+            except Exception as e:
+                logger.error(f"Retry scheduler error: {e}")
+
+    def _dispatch(self, row_id: int, channel: str, message: Dict[str, Any], attempt: int) -> None:
+        if self.metrics:
+            self.metrics.retries_total.labels(channel).inc()
+        try:
+            future = self.submit(channel, message)
+        except Exception as e:
+            with self._store_lock:
+                # 종료 중 채널 워커 풀이 닫혀 넘기지 못한 항목은 in_flight로 남겨 다음 실행에서 다시 시도합니다.
+                if not self._closed and not self._stopped.is_set():
+                    self._retry_or_dead_letter(row_id, channel, message, attempt + 1, str(e))
+            return
+
+        def on_done(done_future) -> None:
+            with self._store_lock:
+                self._dispatched.discard(done_future)
+                if self._closed or done_future.cancelled():
+                    # 종료 중이면 항목을 in_flight로 남겨 두고 다음 실행에서 다시 시도합니다.
+                    return
+                error = done_future.exception()
+                if error is None:
+                    self.store.remove(row_id)
+                    logger.info(f"Retry {attempt} for {channel} succeeded")
+                else:
+                    self._retry_or_dead_letter(row_id, channel, message, attempt + 1, str(error))
+
+        with self._store_lock:
+            self._dispatched.add(future)
+        future.add_done_callback(on_done)
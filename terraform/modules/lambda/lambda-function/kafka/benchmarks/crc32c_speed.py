@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+"""Compare CRC-32C throughput of the available backends.
+
+"bytewise" is the previous byte-at-a-time pure python loop, "slicing_by_8"
+the current pure python fallback. "ctypes" (system libcrc32c) and
+"crc32c_package" are only benchmarked when installed. pyperf reports time per
+call; throughput is printed for each backend once before the runs start.
+
+pyperf workers do not inherit the environment: if libcrc32c is only found
+through LD_LIBRARY_PATH, run with --inherit-environ=LD_LIBRARY_PATH.
+"""
+from __future__ import print_function
+import os
+import time
+
+import pyperf
+
+from kafka.record._crc32c import CRC_TABLE, crc as crc_slicing_by_8
+from kafka.record.util import _load_crc32c_library, crc32c_c
+
+
+DATA_SIZES = [1024, 64 * 1024, 1024 * 1024]
+
+
+def crc_bytewise(data):
+    crc = 0xFFFFFFFF
+    for b in bytearray(data):
+        crc = CRC_TABLE[(crc ^ b) & 0xff] ^ (crc >> 8)
+    return crc ^ 0xFFFFFFFF
+
+
+def backends():
+    found = [('bytewise', crc_bytewise), ('slicing_by_8', crc_slicing_by_8)]
+    crc_ctypes = _load_crc32c_library()
+    if crc_ctypes is not None:
+        found.append(('ctypes', crc_ctypes))
+    if crc32c_c is not None:
+        found.append(('crc32c_package', crc32c_c))
+    return found
+
+
+def throughput(crc_func, data):
+    loops = 1
+    while True:
+        t0 = time.time()
+        for _ in range(loops):
+            crc_func(data)
+        elapsed = time.time() - t0
+        if elapsed > 0.2:
+            return len(data) * loops / elapsed / (1024 * 1024)
+        loops *= 2
+
+
+if __name__ == '__main__':
+    runner = pyperf.Runner()
+    runner.parse_args()
+    for size in DATA_SIZES:
+        data = os.urandom(size)
+        expected = crc_bytewise(data)
+        for name, crc_func in backends():
+            assert crc_func(data) == expected, name
+            if not runner.args.worker:
+                print('{}_{}: {:.1f} MB/s'.format(name, size, throughput(crc_func, data)))
+            runner.bench_func('crc32c_{}_{}'.format(name, size), crc_func, data)
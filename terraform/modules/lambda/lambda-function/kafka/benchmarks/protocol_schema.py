@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+"""Compare compiled Schema encode/decode against field-by-field encoding.
+
+The "fieldwise" functions reproduce the pre-compilation behaviour: one
+field.encode()/field.decode() call (and one struct call) per field, decoding
+from a BytesIO stream.
+"""
+from __future__ import print_function
+import io
+
+import pyperf
+
+from kafka.protocol.fetch import FetchResponse_v4
+from kafka.protocol.metadata import MetadataResponse_v1
+from kafka.protocol.produce import ProduceRequest_v3
+from kafka.protocol.types import Array, CompactArray, Schema
+
+
+PARTITIONS = 50
+RECORDS = b'\x00' * 512
+
+
+def fieldwise_encode(schema, item):
+    if isinstance(schema, Schema):
+        return b''.join([fieldwise_encode(field, item[i]) for i, field in enumerate(schema.fields)])
+    if isinstance(schema, Array) and not isinstance(schema, CompactArray):
+        if item is None:
+            return b'\xff\xff\xff\xff'
+        return b''.join([len(item).to_bytes(4, 'big')] + [fieldwise_encode(schema.array_of, x) for x in item])
+    return schema.encode(item)
+
+
+def fieldwise_decode(schema, data):
+    if isinstance(schema, Schema):
+        return tuple([fieldwise_decode(field, data) for field in schema.fields])
+    if isinstance(schema, Array) and not isinstance(schema, CompactArray):
+        length = int.from_bytes(data.read(4), 'big', signed=True)
+        if length == -1:
+            return None
+        return [fieldwise_decode(schema.array_of, data) for _ in range(length)]
+    return schema.decode(data)
+
+
+def fetch_response():
+    partitions = [(i, 0, 1000 + i, 1000 + i, [], RECORDS) for i in range(PARTITIONS)]
+    return FetchResponse_v4.SCHEMA, (0, [('fanda-notifications', partitions)])
+
+
+def metadata_response():
+    brokers = [(i, 'b-%d.fanda-msk.kafka.us-east-1.amazonaws.com' % i, 9098, 'use1-az%d' % i) for i in range(3)]
+    partitions = [(0, i, i % 3, [0, 1, 2], [0, 1, 2]) for i in range(PARTITIONS)]
+    return MetadataResponse_v1.SCHEMA, (brokers, 1, [(0, 'fanda-notifications', False, partitions)])
+
+
+def produce_request():
+    partitions = [(i, RECORDS) for i in range(PARTITIONS)]
+    return ProduceRequest_v3.SCHEMA, (None, -1, 30000, [('fanda-notifications', partitions)])
+
+
+def bench_encode(loops, encode, schema, item):
+    t0 = pyperf.perf_counter()
+    for _ in range(loops):
+        encode(schema, item)
+    return pyperf.perf_counter() - t0
+
+
+def bench_decode(loops, decode, schema, encoded):
+    t0 = pyperf.perf_counter()
+    for _ in range(loops):
+        decode(schema, io.BytesIO(encoded))
+    return pyperf.perf_counter() - t0
+
+
+def compiled_encode(schema, item):
+    return schema.encode(item)
+
+
+def compiled_decode(schema, data):
+    return schema.decode(data)
+
+
+if __name__ == '__main__':
+    runner = pyperf.Runner()
+    for name, factory in [
+            ('fetch_response_v4', fetch_response),
+            ('metadata_response_v1', metadata_response),
+            ('produce_request_v3', produce_request)]:
+        schema, item = factory()
+        encoded = fieldwise_encode(schema, item)
+        assert schema.encode(item) == encoded
+        assert schema.decode(io.BytesIO(encoded)) == fieldwise_decode(schema, io.BytesIO(encoded))
+
+        runner.bench_time_func('{}_encode_fieldwise'.format(name), bench_encode, fieldwise_encode, schema, item)
+        runner.bench_time_func('{}_encode_compiled'.format(name), bench_encode, compiled_encode, schema, item)
+        runner.bench_time_func('{}_decode_fieldwise'.format(name), bench_decode, fieldwise_decode, schema, encoded)
+        runner.bench_time_func('{}_decode_compiled'.format(name), bench_decode, compiled_decode, schema, encoded)
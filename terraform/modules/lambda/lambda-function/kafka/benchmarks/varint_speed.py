@@ -1,6 +1,9 @@
 #!/usr/bin/env python
 from __future__ import print_function
+import random
+
 import pyperf
+from kafka.record.default_records import DefaultRecordBatch, DefaultRecordBatchBuilder
 from kafka.vendor import six
 
 
@@ -356,6 +359,65 @@ def decode_varint_3(buffer, pos=0):
             raise ValueError("Out of int64 range")
 
 
+# Record batches for comparing per-field decoding (one decode_varint call per
+# varint, as DefaultRecordBatch used to read records) with the single pass
+# over the batch done by DefaultRecordBatch._read_records.
+BENCH_RECORDS_PER_BATCH = 500
+BENCH_BATCHES = {
+    # Small offset/timestamp deltas and values: mostly 1 byte varints
+    "small": (1, 0, 20),
+    # Realistic records: 2-3 byte lengths, offset and timestamp deltas
+    "medium": (1, 37, 200),
+}
+
+
+def prepare_batch(offset_step, timestamp_step, value_size):
+    builder = DefaultRecordBatchBuilder(
+        magic=2, compression_type=0, is_transactional=False,
+        producer_id=-1, producer_epoch=-1, base_sequence=-1,
+        batch_size=10 * 1024 * 1024)
+    for i in range(BENCH_RECORDS_PER_BATCH):
+        builder.append(
+            i * offset_step, 1505824130000 + i * timestamp_step,
+            b"key-%d" % (i,), bytes(bytearray(random.getrandbits(8) for _ in range(value_size))),
+            headers=[])
+    return bytes(builder.build())
+
+
+def read_records_per_varint(data, decode_varint=decode_varint_3):
+    batch = DefaultRecordBatch(data)
+    buffer = bytearray(data)
+    pos = DefaultRecordBatch.HEADER_STRUCT.size
+    records = []
+    for _ in range(batch.records_count):
+        length, pos = decode_varint(buffer, pos)
+        _, pos = decode_varint(buffer, pos)
+        ts_delta, pos = decode_varint(buffer, pos)
+        offset_delta, pos = decode_varint(buffer, pos)
+        key_len, pos = decode_varint(buffer, pos)
+        key_pos = pos
+        if key_len > 0:
+            pos += key_len
+        value_len, pos = decode_varint(buffer, pos)
+        value_pos = pos
+        if value_len > 0:
+            pos += value_len
+        header_count, pos = decode_varint(buffer, pos)
+        records.append((
+            batch.base_offset + offset_delta, batch.first_timestamp + ts_delta,
+            key_pos, key_len, value_pos, value_len))
+    return records
+
+
+def read_records_bulk(data):
+    batch = DefaultRecordBatch(data)
+    batch._read_records()
+    (_, _, _, offsets, timestamps, key_positions, key_lengths,
+     value_positions, value_lengths, _, _) = batch._records
+    return list(zip(
+        offsets, timestamps, key_positions, key_lengths, value_positions, value_lengths))
+
+
 if __name__ == '__main__':
     _assert_valid_enc(encode_varint_1)
     _assert_valid_enc(encode_varint_2)
@@ -432,3 +494,14 @@ if __name__ == '__main__':
             runner.bench_func(
                 '{}_{}byte'.format(bench_func.__name__, i + 1),
                 bench_func, value)
+
+    # Record batch decoding
+    for name, params in BENCH_BATCHES.items():
+        data = prepare_batch(*params)
+        assert read_records_per_varint(data) == read_records_bulk(data)
+        for bench_func in [
+                read_records_per_varint,
+                read_records_bulk]:
+            runner.bench_func(
+                '{}_{}'.format(bench_func.__name__, name),
+                bench_func, data)
@@ -1145,26 +1145,33 @@ class BrokerConnection(object):
 
     def _recv(self):
         """Take all available bytes from socket, return list of any responses from parser"""
-        recvd = []
+        responses = []
+        total_bytes = 0
+        max_bytes = self.config['sock_chunk_bytes'] * self.config['sock_chunk_buffer_count']
         err = None
         with self._lock:
             if not self._can_send_recv():
                 log.warning('%s: cannot recv: socket not connected', self)
                 return ()
 
-            while len(recvd) < self.config['sock_chunk_buffer_count']:
+            # Read directly into the parser's preallocated response buffer
+            # rather than joining chunks and copying them into it. We keep the
+            # lock through protocol receipt so that the processed byte order
+            # is the same as the received byte order.
+            while total_bytes < max_bytes:
                 try:
-                    data = self._sock.recv(self.config['sock_chunk_bytes'])
-                    # We expect socket.recv to raise an exception if there are no
+                    buf = self._protocol.recv_buffer()
+                    nbytes = self._sock.recv_into(buf, min(len(buf), max_bytes - total_bytes))
+                    # We expect socket.recv_into to raise an exception if there are no
                     # bytes available to read from the socket in non-blocking mode.
-                    # but if the socket is disconnected, we will get empty data
+                    # but if the socket is disconnected, we will get 0 bytes
                     # without an exception raised
-                    if not data:
+                    if not nbytes:
                         log.error('%s: socket disconnected', self)
                         err = Errors.KafkaConnectionError('socket disconnected')
                         break
-                    else:
-                        recvd.append(data)
+                    total_bytes += nbytes
+                    responses.extend(self._protocol.bytes_received(nbytes))
 
                 except (SSLWantReadError, SSLWantWriteError):
                     break
@@ -1180,20 +1187,15 @@ class BrokerConnection(object):
                         break
                     # For PY2 this is a catchall and should be re-raised
                     raise
+                except Errors.KafkaProtocolError as e:
+                    err = e
+                    break
 
-            # Only process bytes if there was no connection exception
+            # Only return responses if there was no connection exception
             if err is None:
-                recvd_data = b''.join(recvd)
                 if self._sensors:
-                    self._sensors.bytes_received.record(len(recvd_data))
-
-                # We need to keep the lock through protocol receipt
-                # so that we ensure that the processed byte order is the
-                # same as the received byte order
-                try:
-                    return self._protocol.receive_bytes(recvd_data)
-                except Errors.KafkaProtocolError as e:
-                    err = e
+                    self._sensors.bytes_received.record(total_bytes)
+                return responses
 
         self.close(error=err)
         return ()
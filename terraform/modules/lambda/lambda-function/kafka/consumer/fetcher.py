@@ -17,6 +17,7 @@ from kafka.protocol.list_offsets import (
     ListOffsetsRequest, OffsetResetStrategy, UNKNOWN_OFFSET
 )
 from kafka.record import MemoryRecords
+from kafka.record.util import log_crc32c_backend
 from kafka.serializer import Deserializer
 from kafka.structs import TopicPartition, OffsetAndMetadata, OffsetAndTimestamp
 from kafka.util import Timer
@@ -38,6 +39,109 @@ ConsumerRecord = collections.namedtuple("ConsumerRecord",
      "key", "value", "headers", "checksum", "serialized_key_size", "serialized_value_size", "serialized_header_size"])
 
 
+_UNSET = object()
+
+
+class LazyConsumerRecord(object):
+    """ConsumerRecord that defers work until a field is first read.
+
+    Holds the record read from the batch and only deserializes key / value,
+    and computes the serialized sizes, when those fields are accessed.
+    Returned instead of ConsumerRecord when the consumer is configured with
+    lazy_records=True. Exposes the same fields, in the same order, and
+    supports iteration / indexing like the namedtuple. Note that
+    deserializer errors are raised on first access of key / value rather
+    than while fetching.
+    """
+    __slots__ = ("topic", "partition", "leader_epoch", "_record",
+                 "_key_deserializer", "_value_deserializer", "_key", "_value")
+
+    _fields = ConsumerRecord._fields
+
+    def __init__(self, topic, partition, leader_epoch, record, key_deserializer, value_deserializer):
+        self.topic = topic
+        self.partition = partition
+        self.leader_epoch = leader_epoch
+        self._record = record
+        self._key_deserializer = key_deserializer
+        self._value_deserializer = value_deserializer
+        self._key = _UNSET
+        self._value = _UNSET
+
+    @property
+    def offset(self):
+        return self._record.offset
+
+    @property
+    def timestamp(self):
+        return self._record.timestamp
+
+    @property
+    def timestamp_type(self):
+        return self._record.timestamp_type
+
+    @property
+    def key(self):
+        if self._key is _UNSET:
+            self._key = _deserialize(self._key_deserializer, self.topic, self._record.key)
+        return self._key
+
+    @property
+    def value(self):
+        if self._value is _UNSET:
+            self._value = _deserialize(self._value_deserializer, self.topic, self._record.value)
+        return self._value
+
+    @property
+    def headers(self):
+        return self._record.headers
+
+    @property
+    def checksum(self):
+        return self._record.checksum
+
+    @property
+    def serialized_key_size(self):
+        key = self._record.key
+        return len(key) if key is not None else -1
+
+    @property
+    def serialized_value_size(self):
+        value = self._record.value
+        return len(value) if value is not None else -1
+
+    @property
+    def serialized_header_size(self):
+        headers = self._record.headers
+        return sum(
+            len(h_key.encode("utf-8")) + (len(h_val) if h_val is not None else 0) for h_key, h_val in
+            headers) if headers else -1
+
+    def __iter__(self):
+        return (getattr(self, field) for field in self._fields)
+
+    def __getitem__(self, index):
+        return getattr(self, self._fields[index])
+
+    def __len__(self):
+        return len(self._fields)
+
+    def _asdict(self):
+        return collections.OrderedDict((field, getattr(self, field)) for field in self._fields)
+
+    def __repr__(self):
+        return "LazyConsumerRecord(%s)" % ", ".join(
+            "%s=%r" % (field, getattr(self, field)) for field in self._fields)
+
+
+def _deserialize(f, topic, bytes_):
+    if not f:
+        return bytes_
+    if isinstance(f, Deserializer):
+        return f.deserialize(topic, bytes_)
+    return f(bytes_)
+
+
 CompletedFetch = collections.namedtuple("CompletedFetch",
     ["topic_partition", "fetched_offset", "response_version",
      "partition_data", "metric_aggregator"])
@@ -71,6 +175,7 @@ class Fetcher(six.Iterator):
         'retry_backoff_ms': 100,
         'enable_incremental_fetch_sessions': True,
         'isolation_level': 'read_uncommitted',
+        'lazy_records': False,
     }
 
     def __init__(self, client, subscriptions, **configs):
@@ -114,6 +219,9 @@ class Fetcher(six.Iterator):
             isolation_level (str): Configure KIP-98 transactional consumer by
                 setting to 'read_committed'. This will cause the consumer to
                 skip records from aborted tranactions. Default: 'read_uncommitted'
+            lazy_records (bool): Return LazyConsumerRecord instances, which
+                only deserialize key / value and compute serialized sizes when
+                those fields are first accessed. Default: False
         """
         self.config = copy.copy(self.DEFAULT_CONFIG)
         for key in self.config:
@@ -134,6 +242,8 @@ class Fetcher(six.Iterator):
         else:
             self._sensors = None
         self._isolation_level = ISOLATION_LEVEL_CONFIG[self.config['isolation_level']]
+        if self.config['check_crcs']:
+            log_crc32c_backend()
         self._session_handlers = {}
         self._nodes_with_pending_fetch_requests = set()
         self._cached_list_offsets_exception = None
@@ -832,6 +942,7 @@ class Fetcher(six.Iterator):
                                                        key_deserializer=self.config['key_deserializer'],
                                                        value_deserializer=self.config['value_deserializer'],
                                                        check_crcs=self.config['check_crcs'],
+                                                       lazy_records=self.config['lazy_records'],
                                                        isolation_level=self._isolation_level,
                                                        aborted_transactions=aborted_transactions,
                                                        metric_aggregator=completed_fetch.metric_aggregator,
@@ -913,6 +1024,7 @@ class Fetcher(six.Iterator):
                      key_deserializer=None, value_deserializer=None,
                      check_crcs=True, isolation_level=READ_UNCOMMITTED,
                      aborted_transactions=None, # raw data from response / list of (producer_id, first_offset) tuples
+                     lazy_records=False,
                      metric_aggregator=None, on_drain=lambda x: None):
             self.fetch_offset = fetch_offset
             self.topic_partition = tp
@@ -928,6 +1040,7 @@ class Fetcher(six.Iterator):
             )
             self.metric_aggregator = metric_aggregator
             self.check_crcs = check_crcs
+            self.lazy_records = lazy_records
             self.record_iterator = itertools.dropwhile(
                 self._maybe_skip_record,
                 self._unpack_records(tp, records, key_deserializer, value_deserializer))
@@ -1028,6 +1141,14 @@ class Fetcher(six.Iterator):
                             raise Errors.CorruptRecordError(
                                     "Record for partition %s at offset %s failed crc check" % (
                                         self.topic_partition, record.offset))
+                        if self.lazy_records:
+                            self.records_read += 1
+                            self.bytes_read += record.size_in_bytes
+                            self.next_fetch_offset = record.offset + 1
+                            yield LazyConsumerRecord(
+                                tp.topic, tp.partition, self.leader_epoch, record,
+                                key_deserializer, value_deserializer)
+                            continue
                         key_size = len(record.key) if record.key is not None else -1
                         value_size = len(record.value) if record.value is not None else -1
                         key = self._deserialize(key_deserializer, tp.topic, record.key)
@@ -1063,11 +1184,7 @@ class Fetcher(six.Iterator):
                 raise RuntimeError('StopIteration raised unpacking messageset')
 
         def _deserialize(self, f, topic, bytes_):
-            if not f:
-                return bytes_
-            if isinstance(f, Deserializer):
-                return f.deserialize(topic, bytes_)
-            return f(bytes_)
+            return _deserialize(f, topic, bytes_)
 
         def _consume_aborted_transactions_up_to(self, offset):
             if not self.aborted_transactions:
@@ -124,6 +124,11 @@ class KafkaConsumer(six.Iterator):
         isolation_level (str): Configure KIP-98 transactional consumer by
             setting to 'read_committed'. This will cause the consumer to
             skip records from aborted transactions. Default: 'read_uncommitted'
+        lazy_records (bool): Return records that only deserialize the key /
+            value and compute serialized sizes when those fields are first
+            accessed, instead of ConsumerRecord namedtuples. Useful when most
+            of each record is never read. Deserializer errors are then raised
+            on field access. Default: False
         allow_auto_create_topics (bool): Enable/disable auto topic creation
             on metadata request. Only available with api_version >= (0, 11).
             Default: True
@@ -294,6 +299,7 @@ class KafkaConsumer(six.Iterator):
         'default_offset_commit_callback': lambda offsets, response: True,
         'check_crcs': True,
         'isolation_level': 'read_uncommitted',
+        'lazy_records': False,
         'allow_auto_create_topics': True,
         'metadata_max_age_ms': 5 * 60 * 1000,
         'partition_assignment_strategy': (RangePartitionAssignor, RoundRobinPartitionAssignor),
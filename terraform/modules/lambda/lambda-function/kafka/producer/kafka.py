@@ -21,6 +21,7 @@ from kafka.producer.sender import Sender
 from kafka.producer.transaction_manager import TransactionManager
 from kafka.record.default_records import DefaultRecordBatchBuilder
 from kafka.record.legacy_records import LegacyRecordBatchBuilder
+from kafka.record.util import log_crc32c_backend
 from kafka.serializer import Serializer
 from kafka.structs import TopicPartition
 from kafka.util import Timer, ensure_valid_topic_name
@@ -561,6 +562,7 @@ class KafkaProducer(object):
 
         self._cleanup = self._cleanup_factory()
         atexit.register(self._cleanup)
+        log_crc32c_backend()
         log.debug("%s: Kafka producer started", str(self))
 
     def bootstrap_connected(self):
@@ -91,47 +91,68 @@ class KafkaProtocol(object):
              CorrelationIdError: if the response does not match the request
                  correlation id.
         """
+        data = memoryview(data)
         i = 0
         n = len(data)
         responses = []
         while i < n:
-
-            # Not receiving is the state of reading the payload header
-            if not self._receiving:
-                bytes_to_read = min(4 - self._header.tell(), n - i)
-                self._header.write(data[i:i+bytes_to_read])
-                i += bytes_to_read
-
-                if self._header.tell() == 4:
-                    self._header.seek(0)
-                    nbytes = Int32.decode(self._header)
-                    # reset buffer and switch state to receiving payload bytes
-                    self._rbuffer = KafkaBytes(nbytes)
-                    self._receiving = True
-                elif self._header.tell() > 4:
-                    raise Errors.KafkaError('this should not happen - are you threading?')
-
-            if self._receiving:
-                total_bytes = len(self._rbuffer)
-                staged_bytes = self._rbuffer.tell()
-                bytes_to_read = min(total_bytes - staged_bytes, n - i)
-                self._rbuffer.write(data[i:i+bytes_to_read])
-                i += bytes_to_read
-
-                staged_bytes = self._rbuffer.tell()
-                if staged_bytes > total_bytes:
-                    raise Errors.KafkaError('Receive buffer has more bytes than expected?')
-
-                if staged_bytes != total_bytes:
-                    break
-
-                self._receiving = False
-                self._rbuffer.seek(0)
-                resp = self._process_response(self._rbuffer)
-                responses.append(resp)
-                self._reset_buffer()
+            buf = self.recv_buffer()
+            bytes_to_read = min(len(buf), n - i)
+            buf[:bytes_to_read] = data[i:i+bytes_to_read]
+            i += bytes_to_read
+            responses.extend(self.bytes_received(bytes_to_read))
         return responses
 
+    def recv_buffer(self):
+        """Return a writable memoryview for the next bytes expected from the network.
+
+        While waiting for the 4-byte size prefix this is the unfilled part of
+        the header; afterwards it is the unfilled part of a bytearray
+        preallocated to the full response size. Callers read from the socket
+        directly into it (socket.recv_into) and then call bytes_received(),
+        so response bytes are not copied before decoding.
+        """
+        if not self._receiving:
+            return memoryview(self._header)[self._header.tell():]
+        return memoryview(self._rbuffer)[self._rbuffer.tell():]
+
+    def bytes_received(self, nbytes):
+        """Account for nbytes written into the buffer returned by recv_buffer().
+
+        Returns:
+            responses (list of (correlation_id, response)): the response
+                completed by these bytes, if any.
+
+        Raises:
+             KafkaProtocolError: if the bytes received could not be decoded.
+             CorrelationIdError: if the response does not match the request
+                 correlation id.
+        """
+        if not self._receiving:
+            self._header.seek(self._header.tell() + nbytes)
+            if self._header.tell() < 4:
+                return []
+            elif self._header.tell() > 4:
+                raise Errors.KafkaError('this should not happen - are you threading?')
+            self._header.seek(0)
+            total_bytes = Int32.decode(self._header)
+            # reset buffer and switch state to receiving payload bytes
+            self._rbuffer = KafkaBytes(total_bytes)
+            self._receiving = True
+        else:
+            self._rbuffer.seek(self._rbuffer.tell() + nbytes)
+            if self._rbuffer.tell() > len(self._rbuffer):
+                raise Errors.KafkaError('Receive buffer has more bytes than expected?')
+
+        if self._rbuffer.tell() != len(self._rbuffer):
+            return []
+
+        self._receiving = False
+        self._rbuffer.seek(0)
+        resp = self._process_response(self._rbuffer)
+        self._reset_buffer()
+        return [resp]
+
     def _process_response(self, read_buffer):
         if not self.in_flight_requests:
             raise Errors.CorrelationIdError('No in-flight-request found for server response')
@@ -1,7 +1,5 @@
 from __future__ import absolute_import
 
-from io import BytesIO
-
 from kafka.protocol.abstract import AbstractType
 from kafka.protocol.types import Schema
 
@@ -33,10 +31,7 @@ class Struct(AbstractType):
 
     @classmethod
     def encode(cls, item):  # pylint: disable=E0202
-        bits = []
-        for i, field in enumerate(cls.SCHEMA.fields):
-            bits.append(field.encode(item[i]))
-        return b''.join(bits)
+        return cls.SCHEMA.encode(item)
 
     def _encode_self(self):
         return self.SCHEMA.encode(
@@ -45,9 +40,8 @@ class Struct(AbstractType):
 
     @classmethod
     def decode(cls, data):
-        if isinstance(data, bytes):
-            data = BytesIO(data)
-        return cls(*[field.decode(data) for field in cls.SCHEMA.fields])
+        # Schema.decode accepts bytes/memoryview or a BytesIO stream
+        return cls(*cls.SCHEMA.decode(data))
 
     def get_item(self, name):
         if name not in self.SCHEMA.names:
@@ -1,6 +1,7 @@
 from __future__ import absolute_import
 
 import struct
+from io import BytesIO
 from struct import error
 
 from kafka.protocol.abstract import AbstractType
@@ -25,9 +26,57 @@ def _unpack(f, data):
                         .format(data, f, e))
 
 
+def _unpack_from(s, view, pos):
+    """Unpack struct `s` from `view` at offset `pos`; returns (values, new_pos)"""
+    try:
+        return s.unpack_from(view, pos), pos + s.size
+    except error as e:
+        raise ValueError("Error encountered when attempting to unpack {} bytes at offset {}"
+                         " with struct format: '{}', hit error: {}"
+                         .format(len(view), pos, s.format, e))
+
+
+class _ViewReader(object):
+    """Minimal read/seek/tell stream over a memoryview. Unlike BytesIO(view),
+    which copies the whole buffer up front, only the bytes actually read are
+    copied."""
+    __slots__ = ('_view', '_idx')
+
+    def __init__(self, view):
+        self._view = view
+        self._idx = 0
+
+    def read(self, nbytes=None):
+        start = self._idx
+        end = len(self._view) if nbytes is None else min(start + nbytes, len(self._view))
+        self._idx = end
+        return self._view[start:end].tobytes()
+
+    def seek(self, idx):
+        self._idx = idx
+
+    def tell(self):
+        return self._idx
+
+
+def _decode_field_from(field, view, pos, stream):
+    """Decode `field` at `pos`, falling back to the stream decoder for types
+    that do not implement decode_from(). Returns (value, new_pos)."""
+    decode_from = getattr(field, 'decode_from', None)
+    if decode_from is not None:
+        return decode_from(view, pos, stream)
+    if stream is None:
+        stream = _ViewReader(view)
+    stream.seek(pos)
+    value = field.decode(stream)
+    return value, stream.tell()
+
+
 class Int8(AbstractType):
-    _pack = struct.Struct('>b').pack
-    _unpack = struct.Struct('>b').unpack
+    fmt = 'b'
+    _struct = struct.Struct('>b')
+    _pack = _struct.pack
+    _unpack = _struct.unpack
 
     @classmethod
     def encode(cls, value):
@@ -37,10 +86,17 @@ class Int8(AbstractType):
     def decode(cls, data):
         return _unpack(cls._unpack, data.read(1))
 
+    @classmethod
+    def decode_from(cls, view, pos, stream=None):
+        (value,), pos = _unpack_from(cls._struct, view, pos)
+        return value, pos
+
 
 class Int16(AbstractType):
-    _pack = struct.Struct('>h').pack
-    _unpack = struct.Struct('>h').unpack
+    fmt = 'h'
+    _struct = struct.Struct('>h')
+    _pack = _struct.pack
+    _unpack = _struct.unpack
 
     @classmethod
     def encode(cls, value):
@@ -50,10 +106,17 @@ class Int16(AbstractType):
     def decode(cls, data):
         return _unpack(cls._unpack, data.read(2))
 
+    @classmethod
+    def decode_from(cls, view, pos, stream=None):
+        (value,), pos = _unpack_from(cls._struct, view, pos)
+        return value, pos
+
 
 class Int32(AbstractType):
-    _pack = struct.Struct('>i').pack
-    _unpack = struct.Struct('>i').unpack
+    fmt = 'i'
+    _struct = struct.Struct('>i')
+    _pack = _struct.pack
+    _unpack = _struct.unpack
 
     @classmethod
     def encode(cls, value):
@@ -63,10 +126,17 @@ class Int32(AbstractType):
     def decode(cls, data):
         return _unpack(cls._unpack, data.read(4))
 
+    @classmethod
+    def decode_from(cls, view, pos, stream=None):
+        (value,), pos = _unpack_from(cls._struct, view, pos)
+        return value, pos
+
 
 class Int64(AbstractType):
-    _pack = struct.Struct('>q').pack
-    _unpack = struct.Struct('>q').unpack
+    fmt = 'q'
+    _struct = struct.Struct('>q')
+    _pack = _struct.pack
+    _unpack = _struct.unpack
 
     @classmethod
     def encode(cls, value):
@@ -76,10 +146,17 @@ class Int64(AbstractType):
     def decode(cls, data):
         return _unpack(cls._unpack, data.read(8))
 
+    @classmethod
+    def decode_from(cls, view, pos, stream=None):
+        (value,), pos = _unpack_from(cls._struct, view, pos)
+        return value, pos
+
 
 class Float64(AbstractType):
-    _pack = struct.Struct('>d').pack
-    _unpack = struct.Struct('>d').unpack
+    fmt = 'd'
+    _struct = struct.Struct('>d')
+    _pack = _struct.pack
+    _unpack = _struct.unpack
 
     @classmethod
     def encode(cls, value):
@@ -89,6 +166,11 @@ class Float64(AbstractType):
     def decode(cls, data):
         return _unpack(cls._unpack, data.read(8))
 
+    @classmethod
+    def decode_from(cls, view, pos, stream=None):
+        (value,), pos = _unpack_from(cls._struct, view, pos)
+        return value, pos
+
 
 class String(AbstractType):
     def __init__(self, encoding='utf-8'):
@@ -109,6 +191,15 @@ class String(AbstractType):
             raise ValueError('Buffer underrun decoding string')
         return value.decode(self.encoding)
 
+    def decode_from(self, view, pos, stream=None):
+        length, pos = Int16.decode_from(view, pos)
+        if length < 0:
+            return None, pos
+        end = pos + length
+        if end > len(view):
+            raise ValueError('Buffer underrun decoding string')
+        return str(view[pos:end], self.encoding), end
+
 
 class Bytes(AbstractType):
     @classmethod
@@ -128,14 +219,26 @@ class Bytes(AbstractType):
             raise ValueError('Buffer underrun decoding Bytes')
         return value
 
+    @classmethod
+    def decode_from(cls, view, pos, stream=None):
+        length, pos = Int32.decode_from(view, pos)
+        if length < 0:
+            return None, pos
+        end = pos + length
+        if end > len(view):
+            raise ValueError('Buffer underrun decoding Bytes')
+        return view[pos:end].tobytes(), end
+
     @classmethod
     def repr(cls, value):
         return repr(value[:100] + b'...' if value is not None and len(value) > 100 else value)
 
 
 class Boolean(AbstractType):
-    _pack = struct.Struct('>?').pack
-    _unpack = struct.Struct('>?').unpack
+    fmt = '?'
+    _struct = struct.Struct('>?')
+    _pack = _struct.pack
+    _unpack = _struct.unpack
 
     @classmethod
     def encode(cls, value):
@@ -145,24 +248,96 @@ class Boolean(AbstractType):
     def decode(cls, data):
         return _unpack(cls._unpack, data.read(1))
 
+    @classmethod
+    def decode_from(cls, view, pos, stream=None):
+        (value,), pos = _unpack_from(cls._struct, view, pos)
+        return value, pos
+
 
 class Schema(AbstractType):
+    """A sequence of named fields.
+
+    On first use the schema is compiled into a list of steps in which every
+    run of adjacent fixed-width fields (Int8/16/32/64, Float64, Boolean) is
+    merged into a single struct.Struct, so encoding a run is one pack() call
+    and decoding it is one unpack_from() at an offset into a memoryview.
+    Other fields are encoded/decoded individually, via decode_from() when the
+    type provides it.
+    """
     def __init__(self, *fields):
         if fields:
             self.names, self.fields = zip(*fields)
         else:
             self.names, self.fields = (), ()
+        self._steps = None
+
+    def _compile(self):
+        # steps: (start, end, struct_or_None, field_or_None)
+        steps = []
+        i = 0
+        while i < len(self.fields):
+            j = i
+            while j < len(self.fields) and isinstance(getattr(self.fields[j], 'fmt', None), str):
+                j += 1
+            if j - i > 1:
+                fmt = '>' + ''.join([field.fmt for field in self.fields[i:j]])
+                steps.append((i, j, struct.Struct(fmt), None))
+                i = j
+            else:
+                steps.append((i, i + 1, None, self.fields[i]))
+                i += 1
+        self._steps = steps
+        return steps
 
     def encode(self, item):
         if len(item) != len(self.fields):
             raise ValueError('Item field count does not match Schema')
-        return b''.join([
-            field.encode(item[i])
-            for i, field in enumerate(self.fields)
-        ])
+        steps = self._steps or self._compile()
+        parts = []
+        for start, end, packer, field in steps:
+            if packer is not None:
+                try:
+                    parts.append(packer.pack(*item[start:end]))
+                except error as e:
+                    raise ValueError("Error encountered when attempting to convert values: "
+                                     "{!r} to struct format: '{}', hit error: {}"
+                                     .format(tuple(item[start:end]), packer.format, e))
+            else:
+                parts.append(field.encode(item[start]))
+        return b''.join(parts)
 
     def decode(self, data):
-        return tuple([field.decode(data) for field in self.fields])
+        if not hasattr(data, 'tell'):
+            # bytes / bytearray / memoryview
+            value, _ = self.decode_from(memoryview(data), 0)
+            return value
+        # Streams: decode directly from the underlying buffer at the current
+        # position, then advance the stream (BytesIO, or bytearray-backed
+        # KafkaBytes)
+        if isinstance(data, BytesIO):
+            view = data.getbuffer()
+        elif isinstance(data, bytearray):
+            view = memoryview(data)
+        else:
+            return tuple([field.decode(data) for field in self.fields])
+        try:
+            value, pos = self.decode_from(view, data.tell(), data)
+        finally:
+            view.release()
+        data.seek(pos)
+        return value
+
+    def decode_from(self, view, pos, stream=None):
+        steps = self._steps or self._compile()
+        values = []
+        for _, _, unpacker, field in steps:
+            if unpacker is not None:
+                run, pos = _unpack_from(unpacker, view, pos)
+                values.extend(run)
+            else:
+                value, pos = _decode_field_from(field, view, pos, stream)
+                values.append(value)
+        return tuple(values), pos
 
     def __len__(self):
         return len(self.fields)
@@ -206,6 +381,16 @@ class Array(AbstractType):
             return None
         return [self.array_of.decode(data) for _ in range(length)]
 
+    def decode_from(self, view, pos, stream=None):
+        length, pos = Int32.decode_from(view, pos)
+        if length == -1:
+            return None, pos
+        items = []
+        for _ in range(length):
+            item, pos = _decode_field_from(self.array_of, view, pos, stream)
+            items.append(item)
+        return items, pos
+
     def repr(self, list_of_items):
         if list_of_items is None:
             return 'NULL'
@@ -227,6 +412,23 @@ class UnsignedVarInt32(AbstractType):
         value |= b << i
         return value
 
+    @classmethod
+    def decode_from(cls, view, pos, stream=None):
+        value, i = 0, 0
+        while True:
+            if pos >= len(view):
+                raise ValueError('Buffer underrun decoding varint')
+            b = view[pos]
+            pos += 1
+            if not (b & 0x80):
+                break
+            value |= (b & 0x7f) << i
+            i += 7
+            if i > 28:
+                raise ValueError('Invalid value {}'.format(value))
+        value |= b << i
+        return value, pos
+
     @classmethod
     def encode(cls, value):
         value &= 0xffffffff
@@ -291,6 +493,16 @@ class CompactString(String):
             raise ValueError('Buffer underrun decoding string')
         return value.decode(self.encoding)
 
+    def decode_from(self, view, pos, stream=None):
+        length, pos = UnsignedVarInt32.decode_from(view, pos)
+        length -= 1
+        if length < 0:
+            return None, pos
+        end = pos + length
+        if end > len(view):
+            raise ValueError('Buffer underrun decoding string')
+        return str(view[pos:end], self.encoding), end
+
     def encode(self, value):
         if value is None:
             return UnsignedVarInt32.encode(0)
@@ -316,6 +528,23 @@ class TaggedFields(AbstractType):
             ret[tag] = val
         return ret
 
+    @classmethod
+    def decode_from(cls, view, pos, stream=None):
+        num_fields, pos = UnsignedVarInt32.decode_from(view, pos)
+        ret = {}
+        if not num_fields:
+            return ret, pos
+        prev_tag = -1
+        for i in range(num_fields):
+            tag, pos = UnsignedVarInt32.decode_from(view, pos)
+            if tag <= prev_tag:
+                raise ValueError('Invalid or out-of-order tag {}'.format(tag))
+            prev_tag = tag
+            size, pos = UnsignedVarInt32.decode_from(view, pos)
+            ret[tag] = view[pos:pos + size].tobytes()
+            pos += size
+        return ret, pos
+
     @classmethod
     def encode(cls, value):
         ret = UnsignedVarInt32.encode(len(value))
@@ -339,6 +568,17 @@ class CompactBytes(AbstractType):
             raise ValueError('Buffer underrun decoding Bytes')
         return value
 
+    @classmethod
+    def decode_from(cls, view, pos, stream=None):
+        length, pos = UnsignedVarInt32.decode_from(view, pos)
+        length -= 1
+        if length < 0:
+            return None, pos
+        end = pos + length
+        if end > len(view):
+            raise ValueError('Buffer underrun decoding Bytes')
+        return view[pos:end].tobytes(), end
+
     @classmethod
     def encode(cls, value):
         if value is None:
@@ -363,3 +603,14 @@ class CompactArray(Array):
             return None
         return [self.array_of.decode(data) for _ in range(length)]
 
+    def decode_from(self, view, pos, stream=None):
+        length, pos = UnsignedVarInt32.decode_from(view, pos)
+        length -= 1
+        if length == -1:
+            return None, pos
+        items = []
+        for _ in range(length):
+            item, pos = _decode_field_from(self.array_of, view, pos, stream)
+            items.append(item)
+        return items, pos
+
@@ -22,9 +22,14 @@ See https://en.wikipedia.org/wiki/Cyclic_redundancy_check for details on CRC-32C
 This code is a manual python translation of c code generated by
 pycrc 0.7.1 (https://pycrc.org/). Command line used:
 './pycrc.py --model=crc-32c --generate c --algorithm=table-driven'
+
+crc_update processes 8 bytes per step using the "slicing-by-8" tables
+derived from CRC_TABLE (see Kounavis & Berry, "A Systematic Approach to
+Building High Performance Software-based CRC Generators"), which is about
+2x faster in CPython than the byte-at-a-time loop.
 """
 
-import array
+import struct
 
 CRC_TABLE = (
     0x00000000, 0xf26b8303, 0xe13b70f7, 0x1350f3f4,
@@ -93,9 +98,24 @@ CRC_TABLE = (
     0xbe2da0a5, 0x4c4623a6, 0x5f16d052, 0xad7d5351,
 )
 
+
+def _slicing_tables(table):
+    # SLICING_TABLES[k][i] is the CRC of byte i followed by k zero bytes
+    tables = [tuple(table)]
+    for _ in range(7):
+        prev = tables[-1]
+        tables.append(tuple((crc >> 8) ^ table[crc & 0xff] for crc in prev))
+    return tuple(tables)
+
+
+SLICING_TABLES = _slicing_tables(CRC_TABLE)
+
 CRC_INIT = 0
 _MASK = 0xFFFFFFFF
 
+# One little-endian 32 bit word (xored with the running crc) and 4 single bytes
+_iter_unpack_8 = struct.Struct("<I4B").iter_unpack
+
 
 def crc_update(crc, data):
     """Update CRC-32C checksum with data.
@@ -105,14 +125,22 @@ def crc_update(crc, data):
     Returns:
         32-bit updated CRC-32C as long.
     """
-    if not isinstance(data, array.array) or data.itemsize != 1:
-        buf = array.array("B", data)
-    else:
-        buf = data
+    try:
+        buf = memoryview(data)
+    except TypeError:
+        buf = memoryview(bytearray(data))
+    if buf.ndim != 1 or buf.itemsize != 1:
+        buf = buf.cast("B")
+    t0, t1, t2, t3, t4, t5, t6, t7 = SLICING_TABLES
     crc = crc ^ _MASK
-    for b in buf:
-        table_index = (crc ^ b) & 0xff
-        crc = (CRC_TABLE[table_index] ^ (crc >> 8)) & _MASK
+    tail = len(buf) & ~7
+    for word, b4, b5, b6, b7 in _iter_unpack_8(buf[:tail]):
+        word ^= crc
+        crc = (t7[word & 0xff] ^ t6[(word >> 8) & 0xff] ^
+               t5[(word >> 16) & 0xff] ^ t4[word >> 24] ^
+               t3[b4] ^ t2[b5] ^ t1[b6] ^ t0[b7])
+    for b in buf[tail:]:
+        crc = t0[(crc ^ b) & 0xff] ^ (crc >> 8)
     return crc ^ _MASK
 
 
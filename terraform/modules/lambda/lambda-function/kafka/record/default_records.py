@@ -127,15 +127,17 @@ class DefaultRecordBase(object):
 class DefaultRecordBatch(DefaultRecordBase, ABCRecordBatch):
 
     __slots__ = ("_buffer", "_header_data", "_pos", "_num_records",
-                 "_next_record_index", "_decompressed")
+                 "_next_record_index", "_decompressed", "_records", "_read_error")
 
     def __init__(self, buffer):
-        self._buffer = bytearray(buffer)
+        self._buffer = bytes(buffer)
         self._header_data = self.HEADER_STRUCT.unpack_from(self._buffer)
         self._pos = self.HEADER_STRUCT.size
         self._num_records = self._header_data[12]
         self._next_record_index = 0
         self._decompressed = False
+        self._records = None
+        self._read_error = None
 
     @property
     def base_offset(self):
@@ -245,11 +247,11 @@ class DefaultRecordBatch(DefaultRecordBase, ABCRecordBatch):
                     uncompressed = lz4_decode(data.tobytes())
                 if compression_type == self.CODEC_ZSTD:
                     uncompressed = zstd_decode(data.tobytes())
-                self._buffer = bytearray(uncompressed)
+                self._buffer = bytes(uncompressed)
                 self._pos = 0
         self._decompressed = True
 
-    def _read_msg(
+    def _read_records(
             self,
             decode_varint=decode_varint):
         # Record =>
@@ -262,88 +264,219 @@ class DefaultRecordBatch(DefaultRecordBase, ABCRecordBatch):
         #   Headers => [HeaderKey HeaderValue]
         #     HeaderKey => String
         #     HeaderValue => Bytes
+        #
+        # Decodes the framing of all records in one pass over the buffer into
+        # parallel lists (size, offset, timestamp, key/value position and
+        # length, headers position and count). Records are only built from
+        # them in __next__, slicing key and value straight out of the bytes
+        # buffer. Most varints in a batch fit in one or two bytes, so those
+        # are decoded inline instead of calling decode_varint.
+        # If a record is malformed, scanning stops and the error is raised
+        # when iteration reaches that record.
 
         buffer = self._buffer
         pos = self._pos
-        length, pos = decode_varint(buffer, pos)
-        start_pos = pos
-        _, pos = decode_varint(buffer, pos)  # attrs can be skipped for now
-
-        ts_delta, pos = decode_varint(buffer, pos)
+        base_offset = self.base_offset
         if self.timestamp_type == self.LOG_APPEND_TIME:
-            timestamp = self.max_timestamp
+            first_timestamp, log_append_time = 0, self.max_timestamp
+        else:
+            first_timestamp, log_append_time = self.first_timestamp, None
+
+        sizes = []
+        offsets = []
+        timestamps = []
+        key_positions = []
+        key_lengths = []
+        value_positions = []
+        value_lengths = []
+        header_positions = []
+        header_counts = []
+        add_size = sizes.append
+        add_offset = offsets.append
+        add_timestamp = timestamps.append
+        add_key_pos = key_positions.append
+        add_key_len = key_lengths.append
+        add_value_pos = value_positions.append
+        add_value_len = value_lengths.append
+        add_headers_pos = header_positions.append
+        add_header_count = header_counts.append
+
+        index = 0
+        try:
+            for index in range(self._num_records):
+                b = buffer[pos]
+                if b < 0x80:
+                    length, pos = (b >> 1) ^ -(b & 1), pos + 1
+                elif buffer[pos + 1] < 0x80:
+                    b = (b & 0x7f) | (buffer[pos + 1] << 7)
+                    length, pos = (b >> 1) ^ -(b & 1), pos + 2
+                else:
+                    length, pos = decode_varint(buffer, pos)
+                start_pos = pos
+                # attrs can be skipped for now
+                if buffer[pos] < 0x80:
+                    pos += 1
+                else:
+                    _, pos = decode_varint(buffer, pos)
+
+                b = buffer[pos]
+                if b < 0x80:
+                    ts_delta, pos = (b >> 1) ^ -(b & 1), pos + 1
+                elif buffer[pos + 1] < 0x80:
+                    b = (b & 0x7f) | (buffer[pos + 1] << 7)
+                    ts_delta, pos = (b >> 1) ^ -(b & 1), pos + 2
+                else:
+                    ts_delta, pos = decode_varint(buffer, pos)
+
+                b = buffer[pos]
+                if b < 0x80:
+                    offset_delta, pos = (b >> 1) ^ -(b & 1), pos + 1
+                elif buffer[pos + 1] < 0x80:
+                    b = (b & 0x7f) | (buffer[pos + 1] << 7)
+                    offset_delta, pos = (b >> 1) ^ -(b & 1), pos + 2
+                else:
+                    offset_delta, pos = decode_varint(buffer, pos)
+
+                b = buffer[pos]
+                if b < 0x80:
+                    key_len, pos = (b >> 1) ^ -(b & 1), pos + 1
+                elif buffer[pos + 1] < 0x80:
+                    b = (b & 0x7f) | (buffer[pos + 1] << 7)
+                    key_len, pos = (b >> 1) ^ -(b & 1), pos + 2
+                else:
+                    key_len, pos = decode_varint(buffer, pos)
+                key_pos = pos
+                if key_len > 0:
+                    pos += key_len
+
+                b = buffer[pos]
+                if b < 0x80:
+                    value_len, pos = (b >> 1) ^ -(b & 1), pos + 1
+                elif buffer[pos + 1] < 0x80:
+                    b = (b & 0x7f) | (buffer[pos + 1] << 7)
+                    value_len, pos = (b >> 1) ^ -(b & 1), pos + 2
+                else:
+                    value_len, pos = decode_varint(buffer, pos)
+                value_pos = pos
+                if value_len > 0:
+                    pos += value_len
+
+                b = buffer[pos]
+                if b < 0x80:
+                    header_count, pos = (b >> 1) ^ -(b & 1), pos + 1
+                else:
+                    header_count, pos = decode_varint(buffer, pos)
+                if header_count < 0:
+                    raise CorruptRecordError("Found invalid number of record "
+                                                 "headers {}".format(header_count))
+                headers_pos = pos
+                remaining = header_count
+                while remaining:
+                    # Header key is of type String, that can't be None
+                    h_key_len, pos = decode_varint(buffer, pos)
+                    if h_key_len < 0:
+                        raise CorruptRecordError(
+                            "Invalid negative header key size {}".format(h_key_len))
+                    pos += h_key_len
+                    # Value is of type NULLABLE_BYTES, so it can be None
+                    h_value_len, pos = decode_varint(buffer, pos)
+                    if h_value_len > 0:
+                        pos += h_value_len
+                    remaining -= 1
+
+                # validate whether we have read all header bytes in the current record
+                if pos - start_pos != length:
+                    raise CorruptRecordError(
+                        "Invalid record size: expected to read {} bytes in record "
+                        "payload, but instead read {}".format(length, pos - start_pos))
+
+                add_size(length)
+                add_offset(base_offset + offset_delta)
+                add_timestamp(
+                    first_timestamp + ts_delta if log_append_time is None else log_append_time)
+                add_key_pos(key_pos)
+                add_key_len(key_len)
+                add_value_pos(value_pos)
+                add_value_len(value_len)
+                add_headers_pos(headers_pos)
+                add_header_count(header_count)
+        except CorruptRecordError as err:
+            self._read_error = (index, err)
+        except (ValueError, IndexError) as err:
+            self._read_error = (index, CorruptRecordError(
+                "Found invalid record structure: {!r}".format(err)))
         else:
-            timestamp = self.first_timestamp + ts_delta
+            self._pos = pos
 
-        offset_delta, pos = decode_varint(buffer, pos)
-        offset = self.base_offset + offset_delta
+        self._records = (
+            ControlRecord if self.is_control_batch else DefaultRecord, self.timestamp_type,
+            sizes, offsets, timestamps, key_positions, key_lengths,
+            value_positions, value_lengths, header_positions, header_counts)
 
-        key_len, pos = decode_varint(buffer, pos)
+    def _read_msg(
+            self,
+            index,
+            decode_varint=decode_varint):
+        (record_class, timestamp_type, sizes, offsets, timestamps, key_positions, key_lengths,
+         value_positions, value_lengths, header_positions, header_counts) = self._records
+        buffer = self._buffer
+
+        key_len = key_lengths[index]
         if key_len >= 0:
-            key = bytes(buffer[pos: pos + key_len])
-            pos += key_len
+            pos = key_positions[index]
+            key = buffer[pos: pos + key_len]
         else:
             key = None
 
-        value_len, pos = decode_varint(buffer, pos)
+        value_len = value_lengths[index]
         if value_len >= 0:
-            value = bytes(buffer[pos: pos + value_len])
-            pos += value_len
+            pos = value_positions[index]
+            value = buffer[pos: pos + value_len]
         else:
             value = None
 
-        header_count, pos = decode_varint(buffer, pos)
-        if header_count < 0:
-            raise CorruptRecordError("Found invalid number of record "
-                                         "headers {}".format(header_count))
         headers = []
-        while header_count:
-            # Header key is of type String, that can't be None
-            h_key_len, pos = decode_varint(buffer, pos)
-            if h_key_len < 0:
-                raise CorruptRecordError(
-                    "Invalid negative header key size {}".format(h_key_len))
-            h_key = buffer[pos: pos + h_key_len].decode("utf-8")
-            pos += h_key_len
-
-            # Value is of type NULLABLE_BYTES, so it can be None
-            h_value_len, pos = decode_varint(buffer, pos)
-            if h_value_len >= 0:
-                h_value = bytes(buffer[pos: pos + h_value_len])
-                pos += h_value_len
-            else:
-                h_value = None
-
-            headers.append((h_key, h_value))
-            header_count -= 1
-
-        # validate whether we have read all header bytes in the current record
-        if pos - start_pos != length:
-            raise CorruptRecordError(
-                "Invalid record size: expected to read {} bytes in record "
-                "payload, but instead read {}".format(length, pos - start_pos))
-        self._pos = pos
-
-        if self.is_control_batch:
-            return ControlRecord(
-                length, offset, timestamp, self.timestamp_type, key, value, headers)
-        else:
-            return DefaultRecord(
-                length, offset, timestamp, self.timestamp_type, key, value, headers)
+        header_count = header_counts[index]
+        if header_count:
+            pos = header_positions[index]
+            for _ in range(header_count):
+                h_key_len, pos = decode_varint(buffer, pos)
+                h_key = buffer[pos: pos + h_key_len].decode("utf-8")
+                pos += h_key_len
+
+                h_value_len, pos = decode_varint(buffer, pos)
+                if h_value_len >= 0:
+                    h_value = buffer[pos: pos + h_value_len]
+                    pos += h_value_len
+                else:
+                    h_value = None
+
+                headers.append((h_key, h_value))
+
+        return record_class(
+            sizes[index], offsets[index], timestamps[index], timestamp_type, key, value, headers)
 
     def __iter__(self):
         self._maybe_uncompress()
+        if self._records is None:
+            self._read_records()
         return self
 
     def __next__(self):
-        if self._next_record_index >= self._num_records:
+        if self._records is None:
+            self._maybe_uncompress()
+            self._read_records()
+        index = self._next_record_index
+        if self._read_error is not None and self._read_error[0] == index:
+            raise self._read_error[1]
+        if index >= self._num_records:
             if self._pos != len(self._buffer):
                 raise CorruptRecordError(
                     "{} unconsumed bytes after all records consumed".format(
                         len(self._buffer) - self._pos))
             raise StopIteration
         try:
-            msg = self._read_msg()
+            msg = self._read_msg(index)
         except (ValueError, IndexError) as err:
             raise CorruptRecordError(
                 "Found invalid record structure: {!r}".format(err))
@@ -359,7 +492,7 @@ class DefaultRecordBatch(DefaultRecordBase, ABCRecordBatch):
 
         crc = self.crc
         data_view = memoryview(self._buffer)[self.ATTRIBUTES_OFFSET:]
-        verify_crc = calc_crc32c(data_view.tobytes())
+        verify_crc = calc_crc32c(data_view)
         return crc == verify_crc
 
     def __str__(self):
@@ -1,4 +1,7 @@
 import binascii
+import ctypes
+import ctypes.util
+import logging
 
 from kafka.record._crc32c import crc as crc32c_py
 try:
@@ -6,6 +9,8 @@ try:
 except ImportError:
     crc32c_c = None
 
+log = logging.getLogger(__name__)
+
 
 def encode_varint(value, write):
     """ Encode an integer to a varint presentation. See
@@ -117,9 +122,65 @@ def decode_varint(buffer, pos=0):
             raise ValueError("Out of int64 range")
 
 
-_crc32c = crc32c_py
+def _load_crc32c_library():
+    """ Bind crc32c_extend() from a system libcrc32c (google/crc32c) with
+    ctypes. Returns None if the library is not installed or does not produce
+    the CRC-32C check value.
+    """
+    names = ["libcrc32c.so.1", "libcrc32c.so", "libcrc32c.dylib"]
+    found = ctypes.util.find_library("crc32c")
+    if found is not None and found not in names:
+        names.append(found)
+    for name in names:
+        try:
+            crc32c_ctypes = _bind_crc32c_library(name)
+        except Exception:
+            continue
+        if crc32c_ctypes is not None:
+            return crc32c_ctypes
+    return None
+
+
+def _bind_crc32c_library(name):
+    crc32c_extend = ctypes.CDLL(name).crc32c_extend
+    crc32c_extend.argtypes = (ctypes.c_uint32, ctypes.c_char_p, ctypes.c_size_t)
+    crc32c_extend.restype = ctypes.c_uint32
+
+    def crc32c_ctypes(data):
+        if not isinstance(data, bytes):
+            data = bytes(data)
+        return crc32c_extend(0, data, len(data))
+
+    if crc32c_ctypes(b"123456789") != 0xE3069283:
+        return None
+    return crc32c_ctypes
+
+
+# Preference order: crc32c package, system libcrc32c via ctypes, pure python
 if crc32c_c is not None:
-    _crc32c = crc32c_c
+    _crc32c, CRC32C_BACKEND = crc32c_c, "crc32c package"
+else:
+    _crc32c = _load_crc32c_library()
+    if _crc32c is not None:
+        CRC32C_BACKEND = "libcrc32c (ctypes)"
+    else:
+        _crc32c, CRC32C_BACKEND = crc32c_py, "pure python"
+
+_crc32c_backend_logged = False
+
+
+def log_crc32c_backend():
+    """ Log which CRC-32C implementation is in use, once per process.
+    """
+    global _crc32c_backend_logged
+    if _crc32c_backend_logged:
+        return
+    _crc32c_backend_logged = True
+    if _crc32c is crc32c_py:
+        log.info("Using pure python CRC-32C implementation;"
+                 " install the crc32c package (or libcrc32c) for faster record checksums")
+    else:
+        log.info("Using %s CRC-32C implementation", CRC32C_BACKEND)
 
 
 def calc_crc32c(memview, _crc32c=_crc32c):
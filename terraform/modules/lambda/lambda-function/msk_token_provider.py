@@ -0,0 +1,104 @@
+import logging
+import threading
+import time
+
+try:
+    from kafka.sasl.oauth import AbstractTokenProvider
+except ImportError:  # kafka-python < 2.1
+    from kafka.oauth.abstract import AbstractTokenProvider
+
+logger = logging.getLogger(__name__)
+
+# 토큰 만료 몇 초 전에 새 토큰으로 교체할지 (기본 60초)
+DEFAULT_REFRESH_MARGIN_SECONDS = 60
+
+
+def _construct_auth_token(region, credentials):
+    """
+    공개 API인 generate_auth_token_from_credentials_provider()로 (token, 만료시각 ms)를 반환합니다.
+    이미 만들어 둔 자격 증명 객체를 그대로 돌려주는 CredentialProvider를 넘겨 매번 자격 증명 체인을 탐색하지 않습니다.
+    서명 라이브러리는 import 시 boto3를 함께 불러오므로 실제로 토큰이 필요할 때 import 합니다.
+    """
+    from aws_msk_iam_sasl_signer import MSKAuthTokenProvider
+    from botocore.credentials import CredentialProvider
+
+    class _ReusedCredentialProvider(CredentialProvider):
+        METHOD = 'fanda-cached'
+
+        def load(self):
+            return credentials
+
+    return MSKAuthTokenProvider.generate_auth_token_from_credentials_provider(region, _ReusedCredentialProvider())
+
+
+class CachedMSKTokenProvider(AbstractTokenProvider):
+    """
+    MSK IAM 인증 토큰을 만료 직전까지 캐시하는 토큰 제공자입니다.
+
+    generate_auth_token()은 호출할 때마다 botocore 세션을 새로 만들고 자격 증명 체인을 다시 탐색합니다.
+    이 클래스는 하나의 botocore 세션/자격 증명 객체를 재사용하고, 서명 라이브러리가 계산한 만료 시각
+    (refresh_margin_seconds 전)에 백그라운드 스레드에서 토큰을 미리 갱신합니다.
+    """
+
+    def __init__(self, region: str, refresh_margin_seconds: int = DEFAULT_REFRESH_MARGIN_SECONDS):
+        self.region = region
+        self.refresh_margin_ms = refresh_margin_seconds * 1000
+        self._lock = threading.Lock()
+        self._token = None
+        self._expiration_ms = 0
+        self._session = None
+        self._credentials = None
+        self._refresh_timer = None
+
+    def token(self) -> str:
+        """
+        kafka-python 라이브러리가 인증 토큰을 필요로 할 때마다 이 메서드를 호출합니다.
+        캐시된 토큰이 아직 유효하면 그대로 반환하고, 만료가 임박했으면 새로 생성합니다.
+        """
+        with self._lock:
+            if self._token is None or self._now_ms() >= self._expiration_ms - self.refresh_margin_ms:
+                self._refresh_locked()
+            return self._token
+
+    def close(self) -> None:
+        """예약된 백그라운드 갱신을 취소합니다."""
+        with self._lock:
+            if self._refresh_timer:
+                self._refresh_timer.cancel()
+                self._refresh_timer = None
+
+    def _now_ms(self) -> int:
+        return int(time.time() * 1000)
+
+    def _get_credentials(self):
+        # botocore 세션과 자격 증명 객체는 한 번만 만들고 재사용합니다.
+        # (IRSA 등 갱신형 자격 증명은 botocore가 내부적으로 갱신합니다.)
+        if self._credentials is None:
+            import botocore.session
+            self._session = botocore.session.Session()
+            self._credentials = self._session.get_credentials()
+            if self._credentials is None:
+                raise ValueError("Unable to locate AWS credentials for MSK IAM authentication")
+        return self._credentials
+
+    def _refresh_locked(self) -> None:
+        self._token, self._expiration_ms = _construct_auth_token(self.region, self._get_credentials())
+        expires_in = (self._expiration_ms - self._now_ms()) / 1000
+        logger.info(f"Successfully generated new MSK IAM Auth Token (expires in {expires_in:.0f}s).")
+        self._schedule_refresh_locked()
+
+    def _schedule_refresh_locked(self) -> None:
+        if self._refresh_timer:
+            self._refresh_timer.cancel()
+        delay = max((self._expiration_ms - self.refresh_margin_ms - self._now_ms()) / 1000, 1)
+        self._refresh_timer = threading.Timer(delay, self._background_refresh)
+        self._refresh_timer.daemon = True
+        self._refresh_timer.start()
+
+    def _background_refresh(self) -> None:
+        try:
+            with self._lock:
+                self._refresh_locked()
+        except Exception as e:
+            # 실패하더라도 다음 token() 호출 시 동기적으로 다시 시도합니다.
+            logger.warning(f"Background MSK IAM token refresh failed: {e}")
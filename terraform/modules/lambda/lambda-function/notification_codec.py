@@ -0,0 +1,128 @@
+import json
+import logging
+import os
+import struct
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _stdlib_encode(value: Dict[str, Any]) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _stdlib_decode(data: bytes) -> Dict[str, Any]:
+    # json.loads는 bytes를 직접 받으므로 별도의 decode('utf-8') 복사가 필요 없습니다.
+    return json.loads(data)
+
+
+def _load_orjson():
+    try:
+        import orjson
+    except ImportError:
+        return None
+    return orjson
+
+
+def get_json_codec(name: Optional[str] = None):
+    """
+    (이름, encode, decode)를 반환합니다.
+    name(기본값: NOTIFICATION_CODEC 환경 변수)이 auto이면 orjson이 설치되어 있을 때 orjson을, 아니면 stdlib json을 사용합니다.
+    """
+    name = name or os.environ.get('NOTIFICATION_CODEC', 'auto')
+    if name in ('auto', 'orjson'):
+        orjson = _load_orjson()
+        if orjson is not None:
+            return 'orjson', orjson.dumps, orjson.loads
+        if name == 'orjson':
+            logger.warning("orjson is not installed. Falling back to stdlib json.")
+    return 'json', _stdlib_encode, _stdlib_decode
+
+
+# Producer의 value_serializer, Consumer의 value_deserializer로 사용합니다.
+CODEC_NAME, encode_notification, decode_notification = get_json_codec()
+
+
+# --- Compact 바이너리 포맷 ---
+# Kafka 레코드 헤더 FORMAT_HEADER 값으로 포맷/버전을 구분합니다. 헤더가 없으면 JSON으로 간주합니다.
+FORMAT_HEADER = 'fanda-format'
+FORMAT_JSON = b'json'
+FORMAT_COMPACT_V1 = b'compact-v1'
+
+# compact-v1 레이아웃 (big-endian)
+#   category(u8) fileSize(i64, 없으면 -1)
+#   bucket, key, uploadTime, version: 각각 u16 길이 + UTF-8 (길이 0xFFFF는 None)
+# fileName과 s3Url은 key/bucket에서 다시 만들 수 있으므로 보내지 않습니다.
+_CATEGORIES = ('general', 'positive', 'negative', 'feedback')
+_CATEGORY_CODES = {category: code for code, category in enumerate(_CATEGORIES)}
+_COMPACT_HEAD = struct.Struct('>Bq')
+_STR_LEN = struct.Struct('>H')
+_NONE_LEN = 0xFFFF
+
+
+def _pack_str(value: Optional[str]) -> bytes:
+    if value is None:
+        return _STR_LEN.pack(_NONE_LEN)
+    data = value.encode('utf-8')
+    return _STR_LEN.pack(len(data)) + data
+
+
+def _unpack_str(view: memoryview, pos: int) -> Tuple[Optional[str], int]:
+    (length,) = _STR_LEN.unpack_from(view, pos)
+    pos += _STR_LEN.size
+    if length == _NONE_LEN:
+        return None, pos
+    return str(view[pos:pos + length], 'utf-8'), pos + length
+
+
+def encode_compact(message: Dict[str, Any]) -> bytes:
+    """
+    lambda_handler가 만든 메시지를 compact-v1 포맷으로 인코딩합니다.
+    s3Url이 s3://{bucketName}/{key} 형태이고 category가 알려진 값일 때만 사용할 수 있습니다.
+    """
+    bucket = message['bucketName']
+    prefix = f"s3://{bucket}/"
+    s3_url = message['s3Url']
+    if not s3_url.startswith(prefix) or message['category'] not in _CATEGORY_CODES:
+        raise ValueError(f"Message cannot be encoded in compact format: {s3_url}")
+    file_size = message.get('fileSize')
+    return b''.join((
+        _COMPACT_HEAD.pack(_CATEGORY_CODES[message['category']], -1 if file_size is None else file_size),
+        _pack_str(bucket),
+        _pack_str(s3_url[len(prefix):]),
+        _pack_str(message.get('uploadTime')),
+        _pack_str(message.get('version')),
+    ))
+
+
+def decode_compact(data: bytes) -> Dict[str, Any]:
+    view = memoryview(data)
+    category_code, file_size = _COMPACT_HEAD.unpack_from(view, 0)
+    pos = _COMPACT_HEAD.size
+    bucket, pos = _unpack_str(view, pos)
+    key, pos = _unpack_str(view, pos)
+    upload_time, pos = _unpack_str(view, pos)
+    version, pos = _unpack_str(view, pos)
+    return {
+        'fileName': key.rsplit('/', 1)[-1],
+        'bucketName': bucket,
+        'fileSize': None if file_size == -1 else file_size,
+        'uploadTime': upload_time,
+        'version': version,
+        's3Url': f"s3://{bucket}/{key}",
+        'category': _CATEGORIES[category_code],
+    }
+
+
+def decode_record(value: bytes, headers: Optional[List[Tuple[str, bytes]]]) -> Dict[str, Any]:
+    """
+    레코드 헤더의 포맷에 맞춰 메시지를 디코딩합니다. (롤아웃 중에는 JSON과 compact가 섞여 들어옵니다)
+    """
+    for key, header_value in headers or ():
+        if key == FORMAT_HEADER:
+            if header_value == FORMAT_COMPACT_V1:
+                return decode_compact(value)
+            if header_value != FORMAT_JSON:
+                raise ValueError(f"Unsupported message format: {header_value!r}")
+            break
+    return decode_notification(value)
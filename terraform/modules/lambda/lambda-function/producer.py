@@ -1,13 +1,24 @@
 import os
+import time
+# 콜드 스타트 시 import 소요 시간을 측정하기 위한 기준 시각
+_IMPORT_START = time.perf_counter()
+
 import json
 import logging
-import boto3
+import random
 from kafka import KafkaProducer
+from kafka.codec import has_gzip, has_lz4, has_snappy, has_zstd
 from kafka.errors import KafkaError
-# === 1. AbstractTokenProvider를 import 합니다. ===
-from kafka.sasl.oauth import AbstractTokenProvider
-from aws_msk_iam_sasl_signer import MSKAuthTokenProvider
+# 만료 시각까지 토큰을 캐시하는 IAM 토큰 제공자 (consumer 이미지도 빌드 시 이 파일을 복사해 사용)
+from msk_token_provider import CachedMSKTokenProvider
+# orjson이 있으면 orjson, 없으면 stdlib json을 사용하는 메시지 직렬화기
+from notification_codec import (
+    CODEC_NAME, FORMAT_COMPACT_V1, FORMAT_HEADER, FORMAT_JSON, encode_compact, encode_notification
+)
 from datetime import datetime 
+# boto3와 aws_msk_iam_sasl_signer(내부에서 boto3를 import)는 실제로 필요할 때 import 합니다.
+# (resolve_bootstrap_servers, CachedMSKTokenProvider.token 참고)
+IMPORT_SECONDS = time.perf_counter() - _IMPORT_START
 
 # --- 로깅 설정 ---
 logger = logging.getLogger()
@@ -18,23 +29,90 @@ REGION = os.environ.get('AWS_REGION', 'us-east-1')
 CLUSTER_ARN = os.environ.get('MSK_CLUSTER_ARN')
 TOPIC = os.environ.get('MSK_TOPIC', 'fanda-notifications')
 
-# === 2. AbstractTokenProvider를 상속받도록 클래스를 수정합니다. ===
-class MSKTokenProvider(AbstractTokenProvider):
-    def __init__(self, region: str):
-        self.region = region
+# --- 부트스트랩 브로커 설정 ---
+# MSK_BOOTSTRAP_SERVERS가 있으면 그대로 사용하고, 없으면 캐시 파일 → get_bootstrap_brokers 순으로 조회합니다.
+BOOTSTRAP_SERVERS = os.environ.get('MSK_BOOTSTRAP_SERVERS')
+BOOTSTRAP_CACHE_FILE = os.environ.get('MSK_BOOTSTRAP_CACHE_FILE', '/tmp/msk_bootstrap_servers')
+
+# --- 전송 모드 및 Producer 튜닝 값 ---
+# batch: 이벤트의 모든 레코드를 먼저 send() 한 뒤 한 번의 flush()로 결과를 모읍니다.
+# sync : 레코드마다 future.get()으로 브로커 응답을 기다립니다. (기존 동작)
+SEND_MODE = os.environ.get('SEND_MODE', 'batch')
+SEND_TIMEOUT_SECONDS = float(os.environ.get('SEND_TIMEOUT_SECONDS', '10'))
+PRODUCER_LINGER_MS = int(os.environ.get('PRODUCER_LINGER_MS', '5'))
+PRODUCER_BATCH_SIZE = int(os.environ.get('PRODUCER_BATCH_SIZE', '16384'))
+# 압축 코덱 우선순위 (쉼표로 구분, 예: zstd,lz4,gzip). 라이브러리가 없는 코덱은 건너뛰고, 모두 없으면 압축하지 않습니다.
+# 기본값 none: 배포 패키지에는 zstd/lz4/snappy 라이브러리가 없으므로, 압축은 main.tf에서 명시적으로 켭니다.
+PRODUCER_COMPRESSION_TYPE = os.environ.get('PRODUCER_COMPRESSION_TYPE', 'none')
+
+# 메시지 포맷: json(기본) 또는 compact(바이너리). 포맷은 레코드 헤더(fanda-format)로 컨슈머에 전달됩니다.
+MESSAGE_FORMAT = os.environ.get('MESSAGE_FORMAT', 'json')
+
+# 파티션 키 전략: 같은 키는 항상 같은 파티션으로 가므로 키 단위로 순서가 보장됩니다.
+#   none         : 키 없음 (기존 동작, 파티션에 고르게 분산)
+#   category     : positive/negative/feedback 별로 고정 파티션
+#   bucket_prefix: 버킷 + 폴더 경로(예: fanda-bucket/reports/positive)
+#   object       : 버킷 + 객체 key (같은 객체의 이벤트끼리만 순서 보장)
+PARTITION_KEY_STRATEGY = os.environ.get('PARTITION_KEY_STRATEGY', 'none')
 
-    def token(self) -> str:
-        """
-        kafka-python 라이브러리가 인증 토큰을 필요로 할 때마다 이 메서드를 호출합니다.
-        자동으로 새 토큰을 생성하여 반환하므로 토큰 만료를 걱정할 필요가 없습니다.
-        """
-        token, _ = MSKAuthTokenProvider.generate_auth_token(self.region)
-        logger.info("Successfully generated new MSK IAM Auth Token for Producer.")
-        return token
+# 레코드별 전송 성공 로그를 남길 비율 (0~1). 실패 로그와 호출당 요약 로그는 항상 남깁니다.
+LOG_SAMPLE_RATE = float(os.environ.get('LOG_SAMPLE_RATE', 1.0))
 
 # --- Kafka Producer 초기화를 위한 전역 변수 ---
 producer = None
 
+def _read_bootstrap_cache():
+    try:
+        with open(BOOTSTRAP_CACHE_FILE) as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+def _write_bootstrap_cache(bootstrap_servers):
+    try:
+        with open(BOOTSTRAP_CACHE_FILE, 'w') as f:
+            f.write(bootstrap_servers)
+    except OSError as e:
+        logger.warning(f"Failed to write bootstrap servers cache {BOOTSTRAP_CACHE_FILE}: {e}")
+
+def resolve_compression_type(preference):
+    """
+    preference 순서대로 사용 가능한 압축 코덱 이름을 반환합니다. 'none'이거나 사용 가능한 코덱이 없으면 None.
+    """
+    checkers = {'gzip': has_gzip, 'snappy': has_snappy, 'lz4': has_lz4, 'zstd': has_zstd}
+    for name in [codec.strip().lower() for codec in preference.split(',') if codec.strip()]:
+        if name == 'none':
+            return None
+        if name not in checkers:
+            logger.warning(f"Unknown compression codec '{name}' in PRODUCER_COMPRESSION_TYPE")
+        elif checkers[name]():
+            return name
+        else:
+            logger.info(f"Compression codec '{name}' library is not installed, trying next")
+    return None
+
+def resolve_bootstrap_servers():
+    """
+    부트스트랩 브로커 문자열과 그 출처(env, cache, discovery)를 반환합니다.
+    환경 변수나 캐시 파일에 값이 없을 때만 boto3를 import 하여 MSK API를 호출합니다.
+    """
+    if BOOTSTRAP_SERVERS:
+        return BOOTSTRAP_SERVERS, 'env'
+
+    cached = _read_bootstrap_cache()
+    if cached:
+        return cached, 'cache'
+
+    if not CLUSTER_ARN:
+        raise ValueError("MSK_BOOTSTRAP_SERVERS or MSK_CLUSTER_ARN environment variable must be set")
+
+    import boto3
+    kafka_client = boto3.client('kafka', region_name=REGION)
+    bootstrap_info = kafka_client.get_bootstrap_brokers(ClusterArn=CLUSTER_ARN)
+    bootstrap_servers = bootstrap_info['BootstrapBrokerStringSaslIam']
+    _write_bootstrap_cache(bootstrap_servers)
+    return bootstrap_servers, 'discovery'
+
 def get_kafka_producer():
     """
     전역 producer 인스턴스를 관리하는 함수 (싱글톤 패턴).
@@ -45,98 +123,206 @@ def get_kafka_producer():
         logger.info("Reusing existing Kafka producer instance.")
         return producer
 
-    if not CLUSTER_ARN:
-        raise ValueError("MSK_CLUSTER_ARN environment variable is not set")
-
     logger.info("Initializing Kafka producer for the first time (cold start)...")
     try:
-        # 1. 부트스트랩 브로커 동적 조회
-        kafka_client = boto3.client('kafka', region_name=REGION)
-        bootstrap_info = kafka_client.get_bootstrap_brokers(ClusterArn=CLUSTER_ARN)
-        bootstrap_servers = bootstrap_info['BootstrapBrokerStringSaslIam']
-        logger.info(f"Dynamically fetched bootstrap servers: {bootstrap_servers}")
+        # 1. 부트스트랩 브로커 조회 (env → 캐시 파일 → MSK API)
+        discovery_start = time.perf_counter()
+        bootstrap_servers, source = resolve_bootstrap_servers()
+        discovery_seconds = time.perf_counter() - discovery_start
+        logger.info(f"Resolved bootstrap servers from {source}: {bootstrap_servers}")
 
-        # 2. 동적 토큰 제공자 인스턴스 생성
-        token_provider = MSKTokenProvider(region=REGION)
+        # 2. 토큰 제공자 인스턴스 생성 (만료 직전까지 캐시, 백그라운드 갱신)
+        token_provider = CachedMSKTokenProvider(region=REGION)
 
-        # 3. Kafka Producer 초기화 (변경 없음)
+        # 3. Kafka Producer 초기화
+        compression_type = resolve_compression_type(PRODUCER_COMPRESSION_TYPE)
+        logger.info(f"Producer compression: {compression_type or 'none'} (PRODUCER_COMPRESSION_TYPE={PRODUCER_COMPRESSION_TYPE})")
+        connect_start = time.perf_counter()
         producer = KafkaProducer(
             bootstrap_servers=bootstrap_servers,
             security_protocol='SASL_SSL',
             sasl_mechanism='OAUTHBEARER',
             sasl_oauth_token_provider=token_provider,
-            value_serializer=lambda v: json.dumps(v).encode('utf-8'),
+            # 값은 serialize_message()에서 포맷 헤더와 함께 직접 직렬화합니다.
             retries=5,
-            request_timeout_ms=30000
+            request_timeout_ms=30000,
+            linger_ms=PRODUCER_LINGER_MS,
+            batch_size=PRODUCER_BATCH_SIZE,
+            compression_type=compression_type
+        )
+        connect_seconds = time.perf_counter() - connect_start
+        logger.info(
+            f"Kafka producer initialized successfully "
+            f"(format: {MESSAGE_FORMAT}, codec: {CODEC_NAME}, "
+            f"partition key: {PARTITION_KEY_STRATEGY})."
+        )
+        logger.info(
+            f"Producer startup timing: import={IMPORT_SECONDS * 1000:.1f}ms "
+            f"discovery={discovery_seconds * 1000:.1f}ms ({source}) connect={connect_seconds * 1000:.1f}ms"
         )
-        logger.info("Kafka producer initialized successfully.")
         return producer
     except Exception as e:
         logger.error(f"Failed to create Kafka producer: {e}", exc_info=True)
         raise
 
+def build_message(record):
+    """
+    S3 이벤트 레코드 하나를 Kafka 메시지(dict)로 변환합니다.
+    bucket 또는 key가 없으면 None을 반환합니다.
+    """
+    s3_info = record.get('s3', {})
+    bucket = s3_info.get('bucket', {}).get('name')
+    key = s3_info.get('object', {}).get('key')
+    if not bucket or not key:
+        return None
+
+    # os.path.basename을 사용해 전체 경로(key)에서 파일 이름만 추출합니다.
+    clean_filename = os.path.basename(key)
+    upload_time = record.get('eventTime')
+    version_from_upload = "N/A" # 기본값
+    if upload_time:
+        try:
+            dt_object = datetime.fromisoformat(upload_time.replace('Z', '+00:00'))
+            version_from_upload = dt_object.strftime('%y.%m.%d')
+        except (ValueError, TypeError):
+            version_from_upload = upload_time.split('T')[0]
+
+    #  category 결정 로직
+    category = "general" # 기본값
+    if key.startswith("reports/positive/"):
+        category = "positive"
+    elif key.startswith("reports/negative/"):
+        category = "negative"
+    elif key.startswith("reports/feedback/"):
+        category = "feedback"
+
+    return {
+        'fileName': clean_filename,
+        'bucketName': bucket,
+        'fileSize': s3_info.get('object', {}).get('size'),
+        'uploadTime': record.get('eventTime'),
+        'version': version_from_upload,
+        's3Url': f"s3://{bucket}/{key}",
+        "category": category   # 👈 컨슈머가 이 값을 활용합니다
+    }
+
+def serialize_message(message):
+    """
+    메시지를 (value bytes, headers)로 직렬화합니다.
+    compact 포맷으로 표현할 수 없는 메시지(알 수 없는 category 등)는 JSON으로 보냅니다.
+    """
+    if MESSAGE_FORMAT == 'compact':
+        try:
+            return encode_compact(message), [(FORMAT_HEADER, FORMAT_COMPACT_V1)]
+        except ValueError as e:
+            logger.warning(f"Falling back to JSON format: {e}")
+    return encode_notification(message), [(FORMAT_HEADER, FORMAT_JSON)]
+
+def get_partition_key(message):
+    """
+    PARTITION_KEY_STRATEGY에 따라 메시지의 파티션 키(bytes)를 반환합니다. none이면 None.
+    """
+    if PARTITION_KEY_STRATEGY == 'category':
+        key = message['category']
+    elif PARTITION_KEY_STRATEGY == 'bucket_prefix':
+        object_key = message['s3Url'][len(f"s3://{message['bucketName']}/"):]
+        key = f"{message['bucketName']}/{os.path.dirname(object_key)}"
+    elif PARTITION_KEY_STRATEGY == 'object':
+        key = message['s3Url']
+    else:
+        return None
+    return key.encode('utf-8')
+
+def collect_send_results(kafka_producer, pending):
+    """
+    send()가 반환한 future 목록을 한 번의 flush() 후 모아서 레코드별 결과를 돌려줍니다.
+    flush()와 모든 get()이 SEND_TIMEOUT_SECONDS 하나의 기한을 나눠 쓰므로 전체 대기 시간은 그 이상 늘어나지 않습니다.
+    pending: [(record, future), ...]
+    반환값: [(record, RecordMetadata 또는 None, 예외 또는 None), ...]
+    """
+    deadline = time.monotonic() + SEND_TIMEOUT_SECONDS
+    try:
+        kafka_producer.flush(timeout=SEND_TIMEOUT_SECONDS)
+    except KafkaError as e:
+        # flush 타임아웃이어도 이미 완료된 future의 결과는 아래에서 개별적으로 확인합니다.
+        logger.warning(f"Flush did not complete within {SEND_TIMEOUT_SECONDS}s: {e}")
+
+    results = []
+    for record, future in pending:
+        try:
+            # 기한이 지난 뒤에는 대기 없이 완료 여부만 확인합니다. (미완료 future는 타임아웃 오류)
+            results.append((record, future.get(timeout=max(deadline - time.monotonic(), 0)), None))
+        except Exception as e:
+            results.append((record, None, e))
+    return results
+
+def log_sent(result, key: str) -> None:
+    """
+    전송 성공 로그는 LOG_SAMPLE_RATE 비율만큼만 남깁니다. (실패와 호출당 요약 로그는 항상 남김)
+    Lambda 로그 형식이 JSON이면 extra 필드가 별도 키로 기록됩니다.
+    """
+    if LOG_SAMPLE_RATE < 1 and random.random() >= LOG_SAMPLE_RATE:
+        return
+    logger.info(
+        f"Message sent to topic={result.topic} partition={result.partition} offset={result.offset} for object {key}",
+        extra={'topic': result.topic, 'partition': result.partition, 'offset': result.offset, 'object_key': key}
+    )
+
 # --- Lambda 핸들러 함수 ---
 def lambda_handler(event, context):
-    try:
-        kafka_producer = get_kafka_producer()
-    except Exception as e:
-        return {'statusCode': 500, 'body': json.dumps(f'Failed to initialize Kafka Producer: {str(e)}')}
+    # S3 이벤트 알림은 비동기 호출이므로 반환값(batchItemFailures 등)은 무시됩니다.
+    # 실패는 예외로 알려야 Lambda의 비동기 재시도와 실패 대상(DLQ)이 동작합니다.
+    # (이벤트 전체가 다시 전송되며, 이미 보낸 레코드의 중복은 컨슈머의 중복 제거가 걸러냅니다)
+    kafka_producer = get_kafka_producer()
 
     records = event.get('Records', [])
-    logger.info(f"Received {len(records)} S3 records to process.")
+    logger.info(f"Received {len(records)} S3 records to process (send mode: {SEND_MODE}).")
 
+    # 1. 모든 레코드를 먼저 send() 합니다. (브로커 응답을 기다리지 않음)
+    pending = []
+    sent = 0
+    failed_records = []
     for record in records:
+        key = record.get('s3', {}).get('object', {}).get('key')
         try:
-            s3_info = record.get('s3', {})
-            bucket = s3_info.get('bucket', {}).get('name')
-            key = s3_info.get('object', {}).get('key')
-            if not bucket or not key:
+            message = build_message(record)
+            if message is None:
                 logger.warning(f"Skipping record due to missing bucket or key: {record}")
                 continue
 
-            # os.path.basename을 사용해 전체 경로(key)에서 파일 이름만 추출합니다.
-            clean_filename = os.path.basename(key)  
-            upload_time = record.get('eventTime')
-            version_from_upload = "N/A" # 기본값
-            if upload_time:
-                try:
-                    dt_object = datetime.fromisoformat(upload_time.replace('Z', '+00:00'))
-                    version_from_upload = dt_object.strftime('%y.%m.%d')
-                except (ValueError, TypeError):
-                    version_from_upload = upload_time.split('T')[0]
-
-            #  category 결정 로직
-            category = "general" # 기본값
-            if key.startswith("reports/positive/"):
-                category = "positive"
-            elif key.startswith("reports/negative/"):
-                category = "negative"
-            elif key.startswith("reports/feedback/"):
-                category = "feedback"
-
-
-            message = {
-                'fileName': clean_filename,
-                'bucketName': bucket,
-                'fileSize': s3_info.get('object', {}).get('size'),
-                'uploadTime': record.get('eventTime'),
-                'version': version_from_upload,
-                's3Url': f"s3://{bucket}/{key}",
-                "category": category   # 👈 컨슈머가 이 값을 활용합니다
-            }
-
-            
-
-            future = kafka_producer.send(TOPIC, message)
-            result = future.get(timeout=10)
-            logger.info(f"Message sent to topic={result.topic} partition={result.partition} offset={result.offset}")
+            value, headers = serialize_message(message)
+            future = kafka_producer.send(TOPIC, value, key=get_partition_key(message), headers=headers)
+            if SEND_MODE == 'sync':
+                # 기존 방식: 레코드마다 브로커 응답을 기다립니다.
+                result = future.get(timeout=SEND_TIMEOUT_SECONDS)
+                log_sent(result, key)
+                sent += 1
+            else:
+                pending.append((record, future))
 
         except KafkaError as e:
+            failed_records.append(record)
             logger.error(f"Failed to send message to Kafka for object {key}: {e}")
         except Exception as e:
+            failed_records.append(record)
             logger.error(f"An unexpected error occurred while processing record for object {key}: {e}", exc_info=True)
 
-    kafka_producer.flush()
+    # 2. 한 번의 flush()로 모든 future의 결과를 모아 레코드별로 보고합니다.
+    for record, result, error in collect_send_results(kafka_producer, pending):
+        key = record['s3']['object']['key']
+        if error is None:
+            sent += 1
+            log_sent(result, key)
+        else:
+            failed_records.append(record)
+            logger.error(f"Failed to send message to Kafka for object {key}: {error}")
+
+    logger.info(f"Finished sending S3 records: sent={sent} failed={len(failed_records)}")
+
+    # 3. 하나라도 실패하면 예외를 던져 이벤트가 재시도되게 합니다.
+    if failed_records:
+        failed_keys = [record.get('s3', {}).get('object', {}).get('key') for record in failed_records]
+        raise RuntimeError(f"Failed to send {len(failed_records)} of {len(records)} S3 records to Kafka: {failed_keys}")
 
     return {
         'statusCode': 200,
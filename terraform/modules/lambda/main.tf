@@ -77,19 +77,33 @@ resource "aws_lambda_function" "fanda_s3_to_msk_lambda" {
   # producer.py 환경 변수와 일치해야한다.
   environment {
     variables = {
-      //MSK_BOOTSTRAP_SERVERS = var.msk_bootstrap_servers
+      MSK_BOOTSTRAP_SERVERS = var.msk_bootstrap_servers # 지정 시 콜드 스타트의 브로커 조회를 생략
       MSK_CLUSTER_ARN = var.msk_cluster_arn
       MSK_TOPIC       = "fanda-notifications" # 단일 토픽 이름
       CHANNELS        = "slack,email"         # 메시지 내부에 포함시킬 채널
+      LOG_SAMPLE_RATE = "1.0"                 # 레코드별 전송 성공 로그 샘플링 비율
+      PRODUCER_COMPRESSION_TYPE = "none"      # 압축 코덱 (배포 패키지에 없는 코덱은 건너뜀, 예: "gzip")
     }
   }
 
+  # 로그를 JSON 한 줄로 남깁니다. (logger의 extra 필드가 별도 키로 기록됨)
+  logging_config {
+    log_format            = "JSON"
+    application_log_level = "INFO"
+    system_log_level      = "WARN"
+  }
+
   depends_on = [aws_iam_role_policy_attachment.fanda_msk_producer_policy_attach,
     aws_iam_role_policy_attachment.fanda_lambda_cloudwatch,
   aws_iam_role_policy_attachment.fanda_lambda_basic]
 }
 
 
+# S3 이벤트 알림은 비동기 호출입니다. 핸들러가 예외를 던지면 이벤트 전체를 최대 2번 다시 호출합니다.
+resource "aws_lambda_function_event_invoke_config" "fanda_s3_to_msk_lambda_retry" {
+  function_name          = aws_lambda_function.fanda_s3_to_msk_lambda.function_name
+  maximum_retry_attempts = 2
+}
 
 
 # # S3 초기 폴더 생성